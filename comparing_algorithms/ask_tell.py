@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class AskTellMixin:
+    """Ask/tell interface of a generational optimizer.
+
+        while not opt.done:
+            X = opt.ask()          # candidates to evaluate (any batching / scheduler)
+            opt.tell(X, f(X))      # their objective values, in the same order
+
+    `ask(n)` hands out at most `n` rows of the current generation; the next
+    generation is created once every row of the current one was told. Rows past
+    the remaining budget are never asked for (they get +inf, as in `run`), so
+    budgets, histories and the internal state evolve exactly as in `run`, which
+    itself is a loop over ask/tell.
+
+    The optimizer provides:
+        _counter, _budget      names of the evaluation counter and budget attributes
+        _propose()             candidate matrix of the next generation
+        _eval_rows(X, n)       rows of X that need the objective (default: first n)
+        _complete(X, fvals, n) selection once the whole generation is evaluated
+    """
+
+    _counter = "eval_count"
+    _budget = "max_evals"
+    _gen = None
+
+    @property
+    def done(self):
+        """Budget exhausted or target precision reached."""
+        return (getattr(self, self._counter) >= getattr(self, self._budget)
+                or self.history.target_reached)
+
+    def _eval_rows(self, X, n):
+        return np.arange(n)
+
+    def _next_generation(self):
+        while self._gen is None and not self.done:
+            X = self._propose()
+            n = max(0, min(len(X), getattr(self, self._budget) - getattr(self, self._counter)))
+            rows = self._eval_rows(X, n)
+            gen = {"X": X, "rows": rows, "n": n, "f": np.full(len(X), np.inf), "asked": 0, "told": 0}
+            if len(rows) == 0:
+                self._finish_generation(gen)
+            else:
+                self._gen = gen
+
+    def _finish_generation(self, gen):
+        self._gen = None
+        n, f = gen["n"], gen["f"]
+        setattr(self, self._counter, getattr(self, self._counter) + n)
+        with self.profiler.phase("bookkeeping"):
+            self.history.record(f[:n])
+        self._complete(gen["X"], f, n)
+
+    def ask(self, n=None):
+        """Up to `n` (None = all remaining) candidates of the current generation.
+
+        Returns an empty (0, dim) matrix when the run is done or every row of the
+        current generation was already asked for and waits for `tell`.
+        """
+        self._next_generation()
+        gen = self._gen
+        if gen is None:
+            return np.empty((0, self.dim))
+
+        left = len(gen["rows"]) - gen["asked"]
+        k = left if n is None else max(0, min(n, left))
+        rows = gen["rows"][gen["asked"]:gen["asked"] + k]
+        gen["asked"] += k
+        return gen["X"][rows].copy()
+
+    def tell(self, X, f):
+        """Objective values `f` of the candidates `X`, in the order they were asked for."""
+        gen = self._gen
+        f = np.asarray(f, dtype=float).reshape(-1)
+        if gen is None or gen["told"] + len(f) > gen["asked"]:
+            raise ValueError("tell() dostal víc hodnot, než kolik kandidátů vrátil ask()")
+
+        rows = gen["rows"][gen["told"]:gen["told"] + len(f)]
+        if len(X) != len(f) or not np.allclose(X, gen["X"][rows]):
+            raise ValueError("tell() musí dostat kandidáty ve stejném pořadí, jak je vrátil ask()")
+
+        gen["f"][rows] = f
+        gen["told"] += len(f)
+        if gen["told"] == len(gen["rows"]):
+            self._finish_generation(gen)
+
+    def _step(self):
+        """One generation of `run`: ask everything, evaluate on `self.evaluator`, tell."""
+        X = self.ask()
+        if len(X):
+            with self.profiler.phase("evaluation"):
+                f = self.evaluator(X)
+            self.tell(X, f)
+
+    async def _astep(self, objective):
+        """`_step` with an async objective (`await objective.evaluate_many(X)`, e.g. a
+        `sim_objective.SimulatorObjective`): all rows of the generation are in
+        flight at once, up to the objective's own concurrency limit."""
+        X = self.ask()
+        if len(X):
+            with self.profiler.phase("evaluation"):
+                f = await objective.evaluate_many(X)
+            self.tell(X, f)
@@ -0,0 +1,355 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import importlib.util
+
+import numpy as np
+
+from ga_core import GAReal
+from de_core import DifferentialEvolution
+from pso_core import PSO
+from evaluators import ThreadPoolEvaluator
+from main import sphere, rastrigin
+
+# Reference throughput committed with the repo, measured with the default grid:
+#   python benchmark.py --save-baseline
+# `python benchmark.py` then compares against it. Throughput depends on the machine,
+# so on other hardware save a local baseline first (--baseline PATH --save-baseline).
+BASELINE_PATH = "benchmarks/baseline.json"
+DEFAULT_TOLERANCE = 0.25
+
+DIMS = [10, 30, 100]
+POP_SIZES = [20, 50, 200]
+EVALS = 20_000
+REPEATS = 3
+
+BIN_GA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "geneticky_algoritmus-bin_problem")
+
+
+# ---------------------------------------------------------
+# Objectives
+# ---------------------------------------------------------
+
+def zero(x):
+    """Zero-cost objective, isolates the optimizer overhead."""
+    return np.zeros(x.shape[:-1])
+
+
+OBJECTIVES = {
+    "zero": zero,
+    "sphere": sphere,
+    "rastrigin": rastrigin,
+}
+
+
+# ---------------------------------------------------------
+# Continuous optimizers
+# ---------------------------------------------------------
+
+def continuous_optimizers():
+    """Factories (func, dim, pop, evals) of all continuous optimizer variants."""
+    bounds = (-5.12, 5.12)
+
+    def ga(func, dim, pop, evals):
+        return GAReal(func, dim, bounds, pop_size=pop, max_evals=evals, vectorized=True, seed=1)
+
+    def de(strategy, jde):
+        def factory(func, dim, pop, evals):
+            return DifferentialEvolution(func, dim, bounds, pop_size=pop, max_evals=evals,
+                                         strategy=strategy, jde=jde, vectorized=True, seed=1)
+        return factory
+
+    def pso(topology):
+        def factory(func, dim, pop, evals):
+            return PSO(func, dim, bounds[0], bounds[1], npop=pop, max_fes=evals,
+                       topology=topology, vectorized=True, seed=1)
+        return factory
+
+    return {
+        "GA_real_gauss": ga,
+        "DE_rand1bin": de("rand1bin", False),
+        "DE_best1bin": de("best1bin", False),
+        "DE_best1bin_batch": de("best1bin_batch", False),
+        "jDE_rand1bin": de("rand1bin", True),
+        "PSO_global": pso("global"),
+        "PSO_ring": pso("ring"),
+    }
+
+
+def _time_run(run):
+    """Best wall time of REPEATS calls after one warm-up call
+    (the minimum is the least noisy estimate)."""
+    run()
+    best = np.inf
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_continuous(dims, pop_sizes, objectives, evals):
+    results = {}
+    for algo_name, factory in continuous_optimizers().items():
+        for dim in dims:
+            for pop in pop_sizes:
+                for obj_name in objectives:
+                    func = OBJECTIVES[obj_name]
+                    sec = _time_run(lambda: factory(func, dim, pop, evals).run())
+                    results[f"{algo_name}|D{dim}|N{pop}|{obj_name}"] = _metrics(sec, evals, pop)
+    return results
+
+
+# ---------------------------------------------------------
+# GAReal: batched vs. per-individual offspring
+# ---------------------------------------------------------
+
+class PerIndividualGA(GAReal):
+    """GAReal breeding children one pair at a time with scalar operators
+    (one rank-selection draw per parent, one-point crossover, per-gene Gaussian
+    mutation), as the generational loop did before it was batched."""
+
+    def _rank_selection(self, fitness):
+        """Select a single individual index using rank-based probabilities.
+
+        The selection probabilities favor better-ranked (lower fitness) individuals.
+        """
+        ranks = np.argsort(fitness)
+        probs = np.linspace(1, len(fitness), len(fitness))
+        probs = probs / np.sum(probs)
+        return self.rng.choice(ranks, p=probs[::-1])
+
+    def _crossover(self, p1, p2):
+        """Perform one-point crossover between two parents and return two offspring."""
+        point = self.rng.integers(1, self.dim)
+        c1 = np.concatenate([p1[:point], p2[point:]])
+        c2 = np.concatenate([p2[:point], p1[point:]])
+        return c1, c2
+
+    def _mutate_gauss(self, x):
+        """Apply per-variable Gaussian mutation to a solution and ensure bounds.
+
+        Each variable is mutated with probability `p_mut` using a Gaussian with
+        standard deviation `sigma_frac * (high - low)`.
+        """
+        sigma = self.sigma_frac * (self.high - self.low)
+        for i in range(self.dim):
+            if self.rng.random() < self.p_mut:
+                x[i] += self.rng.normal(0.0, sigma)
+        return self._ensure_bounds(x)
+
+    def _offspring(self, n):
+        children = []
+        while len(children) < n:
+            p1 = self.pop[self._rank_selection(self.fitness)]
+            p2 = self.pop[self._rank_selection(self.fitness)]
+            c1, c2 = self._crossover(p1, p2)
+            children += [self._mutate_gauss(c1), self._mutate_gauss(c2)]
+        return np.array(children[:n])
+
+
+def bench_ga_engine(dims, pop_sizes, evals):
+    """Throughput of whole GAReal runs on the zero objective, batched vs. per-individual operators."""
+    bounds = (-5.12, 5.12)
+    rows = []
+    for dim in dims:
+        for pop in pop_sizes:
+            secs = {}
+            for name, cls in (("per-individual", PerIndividualGA), ("batched", GAReal)):
+                secs[name] = _time_run(lambda: cls(zero, dim, bounds, pop_size=pop, max_evals=evals,
+                                                   vectorized=True, seed=1).run())
+            rows.append((dim, pop, secs["per-individual"], secs["batched"]))
+
+    print("| D | N | per-individual evals/s | batched evals/s | speedup |")
+    print("|---|---|------------------------|-----------------|---------|")
+    for dim, pop, slow, fast in rows:
+        print(f"| {dim} | {pop} | {evals / slow:.0f} | {evals / fast:.0f} | {slow / fast:.1f}× |")
+    return rows
+
+
+# ---------------------------------------------------------
+# Binary GA (geneticky_algoritmus-bin_problem/ga_core.py)
+# ---------------------------------------------------------
+
+def _load_bin_ga():
+    path = os.path.join(BIN_GA_DIR, "ga_core.py")
+    spec = importlib.util.spec_from_file_location("bin_ga_core", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, BIN_GA_DIR)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(BIN_GA_DIR)
+    return module
+
+
+def bench_binary(dims, pop_sizes):
+    bga = _load_bin_ga()
+    problems = {"onemax": bga.fit_onemax, "leading_ones": bga.fit_leading_ones}
+
+    results = {}
+    for selection in ["roulette", "rank"]:
+        for D in dims:
+            for pop in pop_sizes:
+                # population size as an instance parameter: the module settings stay untouched
+                pop_size = max(2, pop)
+                evals = 100 * D
+                for prob_name, fitness_fn in problems.items():
+                    sec = _time_run(lambda: bga.BinaryGA(D, fitness_fn, selection, pop_size=pop_size,
+                                                         seed=1).run())
+                    results[f"binGA_{selection}|D{D}|N{pop_size}|{prob_name}"] = _metrics(sec, evals, pop_size)
+                    sec = _time_run(lambda: bga.BinaryGA(D, prob_name, selection, packed=True,
+                                                         pop_size=pop_size, seed=1).run())
+                    results[f"binGA_packed_{selection}|D{D}|N{pop_size}|{prob_name}"] = _metrics(sec, evals, pop_size)
+    return results
+
+
+# ---------------------------------------------------------
+# Asynchronous vs. generational DE (worker utilization)
+# ---------------------------------------------------------
+
+ASYNC_WORKERS = 8
+ASYNC_EVALS = 800
+
+
+def jittery_sphere(x):
+    """Sphere with a simulator-like cost of 5–45 ms that differs between calls."""
+    time.sleep(0.005 + 0.04 * random.random())
+    return float(np.sum(x ** 2))
+
+
+def bench_async_de(workers=ASYNC_WORKERS, evals=ASYNC_EVALS, dim=10, pop=20):
+    """Measured worker utilization of DE.run_async in generational and steady-state mode.
+
+    Sleeping releases the GIL, so a thread pool stands in for worker processes.
+    """
+    rows = []
+    modes = [("sync", True, None), ("async", False, workers), ("async", False, 2 * workers)]
+    for jde in (False, True):
+        for mode, synchronous, in_flight in modes:
+            with ThreadPoolEvaluator(jittery_sphere, workers) as ev:
+                de = DifferentialEvolution(jittery_sphere, dim, (-5.12, 5.12), pop_size=pop,
+                                           max_evals=evals, jde=jde, evaluator=ev, seed=1)
+                _, best_fit, _ = de.run_async(in_flight=in_flight, synchronous=synchronous)
+            u = de.utilization
+            rows.append({"algorithm": "jDE" if jde else "DE", **u,
+                         "evals": de.eval_count, "best": best_fit})
+
+    print("| Algorithm | Mode | In flight | Wall [s] | Utilization | Evals | Best |")
+    print("|-----------|------|-----------|----------|-------------|-------|------|")
+    for r in rows:
+        print(f"| {r['algorithm']} | {r['mode']} | {r['in_flight']} | {r['wall_sec']:.2f} | "
+              f"{r['utilization']:.0%} | {r['evals']} | {r['best']:.3e} |")
+    return rows
+
+
+# ---------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------
+
+def _metrics(sec, evals, pop):
+    generations = max(1, evals // pop)
+    return {
+        "evals_per_sec": evals / sec,
+        "us_per_generation": 1e6 * sec / generations,
+        "seconds": sec,
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    print(f"Baseline uložen do {path}")
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Cases whose throughput dropped more than `tolerance` below the baseline."""
+    regressions = []
+    for case, m in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        ratio = m["evals_per_sec"] / base["evals_per_sec"]
+        if ratio < 1.0 - tolerance:
+            regressions.append((case, ratio))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print("| Case | evals/s | µs/gen | vs. baseline |")
+    print("|------|---------|--------|--------------|")
+    for case, m in results.items():
+        rel = ""
+        if baseline and case in baseline:
+            rel = f"{m['evals_per_sec'] / baseline[case]['evals_per_sec']:.2f}×"
+        print(f"| {case} | {m['evals_per_sec']:.0f} | {m['us_per_generation']:.1f} | {rel} |")
+
+
+# ---------------------------------------------------------
+# MAIN ENTRY
+# ---------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark propustnosti optimalizátorů.")
+    parser.add_argument("--dims", type=int, nargs="+", default=DIMS)
+    parser.add_argument("--pops", type=int, nargs="+", default=POP_SIZES)
+    parser.add_argument("--objectives", nargs="+", default=list(OBJECTIVES), choices=list(OBJECTIVES))
+    parser.add_argument("--evals", type=int, default=EVALS)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="uložit výsledky jako nový baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="povolený relativní pokles evals/s oproti baseline")
+    parser.add_argument("--no-binary", action="store_true", help="vynechat binární GA")
+    parser.add_argument("--async-de", action="store_true",
+                        help="jen porovnat vytížení pracovníků u generační a asynchronní DE")
+    parser.add_argument("--ga-engine", action="store_true",
+                        help="jen porovnat dávkové a per-individual operátory GAReal")
+    args = parser.parse_args(argv)
+
+    if args.async_de:
+        bench_async_de()
+        return 0
+    if args.ga_engine:
+        bench_ga_engine(args.dims, args.pops, args.evals)
+        return 0
+
+    results = bench_continuous(args.dims, args.pops, args.objectives, args.evals)
+    if not args.no_binary:
+        results.update(bench_binary(args.dims, args.pops))
+
+    baseline = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        return 0
+
+    if baseline is None:
+        print(f"\nBaseline {args.baseline} neexistuje (vytvořte ho přes --save-baseline).")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegrese propustnosti (tolerance {args.tolerance:.0%}):")
+        for case, ratio in regressions:
+            print(f"  {case}: {ratio:.2f}× baseline")
+        return 1
+
+    print("\nBez regresí oproti baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# Canonical file: comparing_algorithms/curve_stats.py. A byte-identical copy lives
+# in pso/ so that the folder runs on its own; edit the canonical file and copy it over.
+
+import numpy as np
+
+# Streaming statistics of convergence curves sampled on a fixed FES grid.
+# A finished run is added and can be dropped right away: memory depends only on
+# the number of grid points (and the small exact-quantile buffer), not on the
+# number of runs.
+
+
+class P2Quantile:
+    """P² estimate (Jain & Chlamtac, 1985) of the p-quantile at m grid points at once.
+
+    The first `exact` values are buffered and give exact quantiles; then the five
+    markers per point are initialized from their ranks and the buffer is freed
+    (plain P² starts from five values and is noticeably off for small counts).
+    """
+
+    def __init__(self, p, m, exact=32):
+        self.p = p
+        self.count = 0
+        self.probs = np.array([0.0, p / 2, p, (1.0 + p) / 2, 1.0])
+        self.buffer = np.empty((m, max(5, exact)))
+        self.heights = self.pos = self.want = None
+
+    def _init_markers(self):
+        n = self.buffer.shape[1]
+        ranks = np.rint(1 + (n - 1) * self.probs)
+        for i in range(1, 5):
+            ranks[i] = max(ranks[i], ranks[i - 1] + 1)
+        for i in range(3, -1, -1):
+            ranks[i] = min(ranks[i], ranks[i + 1] - 1)
+
+        self.heights = np.sort(self.buffer, axis=1)[:, ranks.astype(int) - 1]
+        self.pos = np.tile(ranks, (len(self.heights), 1))
+        self.want = 1 + (n - 1) * self.probs
+        self.buffer = None
+
+    def add(self, x):
+        if self.buffer is not None:
+            self.buffer[:, self.count] = x
+            self.count += 1
+            if self.count == self.buffer.shape[1]:
+                self._init_markers()
+            return
+        self.count += 1
+        q, pos = self.heights, self.pos
+
+        np.minimum(q[:, 0], x, out=q[:, 0])
+        np.maximum(q[:, 4], x, out=q[:, 4])
+        k = np.sum(x[:, None] >= q[:, 1:4], axis=1)
+        pos += np.arange(5) > k[:, None]
+        self.want += self.probs
+
+        for i in (1, 2, 3):
+            d = self.want[i] - pos[:, i]
+            up = (d >= 1) & (pos[:, i + 1] - pos[:, i] > 1)
+            down = (d <= -1) & (pos[:, i - 1] - pos[:, i] < -1)
+            move = up | down
+            if not move.any():
+                continue
+
+            s = np.where(up[move], 1.0, -1.0)
+            qi, qm, qp = q[move, i], q[move, i - 1], q[move, i + 1]
+            ni, nm, npl = pos[move, i], pos[move, i - 1], pos[move, i + 1]
+
+            with np.errstate(invalid="ignore"):
+                parabolic = qi + s / (npl - nm) * ((ni - nm + s) * (qp - qi) / (npl - ni)
+                                                   + (npl - ni - s) * (qi - qm) / (ni - nm))
+                linear = qi + s * (np.where(s > 0, qp, qm) - qi) / (np.where(s > 0, npl, nm) - ni)
+
+            q[move, i] = np.where((qm < parabolic) & (parabolic < qp), parabolic, linear)
+            pos[move, i] += s
+
+    def value(self):
+        if self.buffer is not None:
+            if self.count == 0:
+                return np.full(len(self.buffer), np.nan)
+            return np.quantile(self.buffer[:, :self.count], self.p, axis=1)
+        return self.heights[:, 2].copy()
+
+
+class CurveAggregator:
+    """Per-checkpoint mean / variance (Welford) and approximate quantiles of many runs.
+
+    Args:
+        xs: FES grid the curves are sampled on (length m).
+        quantiles: Probabilities tracked with P² (median and quartiles by default).
+    """
+
+    def __init__(self, xs, quantiles=(0.25, 0.5, 0.75)):
+        self.xs = np.asarray(xs, dtype=float)
+        m = len(self.xs)
+        self.n = 0
+        self._mean = np.zeros(m)
+        self._m2 = np.zeros(m)
+        self._quantiles = {p: P2Quantile(p, m) for p in quantiles}
+
+    def add(self, values):
+        """Add one run: its best-so-far values at the grid points `xs`."""
+        values = np.asarray(values, dtype=float)
+        self.n += 1
+        delta = values - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (values - self._mean)
+        for est in self._quantiles.values():
+            est.add(values)
+
+    @property
+    def mean(self):
+        return self._mean.copy()
+
+    @property
+    def var(self):
+        """Population variance (ddof=0, as np.var)."""
+        return self._m2 / self.n if self.n else np.full(len(self.xs), np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def quantile(self, p):
+        return self._quantiles[p].value()
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def iqr_band(self):
+        """(25 %, 75 %) curves for a shaded band."""
+        return self.quantile(0.25), self.quantile(0.75)
@@ -1,12 +1,35 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
 
+from recorder import HistoryRecorder
+from snapshot import Snapshotter
+from profiling import make_profiler
+from evaluators import make_evaluator
+from ask_tell import AskTellMixin
+
+
+class DifferentialEvolution(AskTellMixin):
+    """DE (rand/1/bin, best/1/bin, jDE); `run()` nebo krok po kroku přes `ask()` / `tell()`.
+
+    Strategie:
+        rand1bin        celá generace se tvoří a vyhodnocuje najednou (dávka).
+        best1bin        klasická best/1/bin: zkušební vektory po jednom a nejlepší
+                        jedinec se mění hned po zlepšení, i uprostřed generace.
+        best1bin_batch  dávková best/1/bin s nejlepším jedincem ze začátku generace;
+                        rychlejší, ale jiný algoritmus (na sphere konverguje pomaleji).
+
+    jDE (v `run()` i `run_async()`): nové F a CR jedince přežijí jen s úspěšným
+    zkušebním vektorem (fu <= f rodiče), jinak zůstávají původní.
+    """
 
-class DifferentialEvolution:
     def __init__(self, func, dim, bounds, pop_size=30, max_evals=10000,
                  strategy="rand1bin", F=0.5, CR=0.8,
-                 jde=False, tau1=0.1, tau2=0.1, seed=42):
+                 jde=False, tau1=0.1, tau2=0.1, vectorized=False, evaluator=None,
+                 record="improvement", checkpoints=None, profile=False,
+                 f_opt=None, target_eps=None, seed=42):
 
         self.func = func
         self.dim = dim
@@ -19,19 +42,19 @@ class DifferentialEvolution:
         self.jde = jde
         self.tau1 = tau1
         self.tau2 = tau2
+        self.vectorized = vectorized  # func takes (N, dim) and returns N values
+        # vyhodnocení populace: "serial" / "thread" / "process" / instance (evaluators.py)
+        self.evaluator = make_evaluator(evaluator, func, vectorized)
+        self._owns_evaluator = isinstance(evaluator, str)
 
         self.rng = np.random.default_rng(seed)
         self.eval_count = 0
-        self.log = []  # (evals, best_fitness)
-
-    def initialize(self):
-        pop = self.rng.uniform(self.lower, self.upper, (self.pop_size, self.dim))
-        fits = np.array([self.evaluate(ind) for ind in pop])
-        return pop, fits
-
-    def evaluate(self, individual):
-        self.eval_count += 1
-        return self.func(individual)
+        self.pop = None
+        self._target = 0  # best1bin: cíl dalšího zkušebního vektoru v generaci
+        # f_opt + target_eps: zastavení po dosažení přesnosti (CEC), FES do přesností
+        self.history = HistoryRecorder(max_evals, record, checkpoints,
+                                       f_opt=f_opt, stop_eps=target_eps)
+        self.profiler = make_profiler(profile)  # časy fází, viz profiling.py
 
     def ensure_bounds(self, vec):
         return np.clip(vec, self.lower, self.upper)
@@ -42,12 +65,54 @@ class DifferentialEvolution:
 
         if self.strategy == "rand1bin":
             v = pop[r1] + Fi * (pop[r2] - pop[r3])
-        elif self.strategy == "best1bin":
+        elif self.strategy in ("best1bin", "best1bin_batch"):
             v = best + Fi * (pop[r1] - pop[r2])
         else:
             raise ValueError("Neznámá strategie DE")
         return self.ensure_bounds(v)
 
+    def _distinct_indices(self, k):
+        """
+        Pro každého jedince i vybere k různých indexů různých od i
+        (bez sestavování seznamu kandidátů pro každého jedince zvlášť).
+        """
+        n = self.pop_size
+        idx = np.empty((n, k + 1), dtype=int)
+        idx[:, 0] = np.arange(n)
+        for j in range(1, k + 1):
+            # náhodné pořadí v doplňku už vybraných indexů
+            r = self.rng.integers(0, n - j, n)
+            taken = np.sort(idx[:, :j], axis=1)
+            for c in range(j):
+                r += r >= taken[:, c]
+            idx[:, j] = r
+        return idx[:, 1:]
+
+    def mutate_all(self, pop, best, F):
+        """Mutantní vektory pro celou populaci; F je skalár nebo vektor (jDE).
+
+        best1bin_batch používá nejlepšího jedince ze začátku generace (best1bin
+        se dávkově netvoří, viz `_propose`).
+        """
+        F = np.reshape(F, (-1, 1))
+        r = self._distinct_indices(3)
+
+        if self.strategy == "rand1bin":
+            v = pop[r[:, 0]] + F * (pop[r[:, 1]] - pop[r[:, 2]])
+        elif self.strategy == "best1bin_batch":
+            v = best + F * (pop[r[:, 0]] - pop[r[:, 1]])
+        else:
+            raise ValueError("Neznámá strategie DE")
+        return self.ensure_bounds(v)
+
+    def crossover_all(self, pop, V, CR):
+        """Binomické křížení pro celou populaci; CR je skalár nebo vektor (jDE)."""
+        CR = np.reshape(CR, (-1, 1))
+        mask = self.rng.random((self.pop_size, self.dim)) < CR
+        jrand = self.rng.integers(0, self.dim, self.pop_size)
+        mask[np.arange(self.pop_size), jrand] = True
+        return self.ensure_bounds(np.where(mask, V, pop))
+
     def crossover(self, xi, vi, CRi):
         ui = xi.copy()
         jrand = self.rng.integers(0, self.dim)
@@ -57,53 +122,281 @@ class DifferentialEvolution:
         return self.ensure_bounds(ui)
 
 
-    def run(self):
-        pop, fits = self.initialize()
-        best_idx = np.argmin(fits)
-        best = pop[best_idx].copy()
-        best_fit = fits[best_idx]
+    @property
+    def _sequential(self):
+        """best1bin potřebuje po každém vyhodnocení aktuálního nejlepšího jedince."""
+        return self.strategy == "best1bin"
+
+    def _propose(self):
+        """Kandidáti další generace: počáteční populace, potom zkušební vektory U.
+
+        U best1bin je „generace“ pro ask/tell jeden zkušební vektor (cíl `_target`);
+        výsledky se sbírají do nové populace, která platí po posledním cíli.
+        """
+        if self.pop is None:
+            with self.profiler.phase("init"):
+                return self.rng.uniform(self.lower, self.upper, (self.pop_size, self.dim))
+
+        if self._sequential:
+            with self.profiler.phase("variation"):
+                if self._target == 0:
+                    self._new_pop, self._new_fits = self.pop.copy(), self.fits.copy()
+                u, self._trial_F, self._trial_CR = self._trial(self._target)
+                return u[None, :]
+
+        with self.profiler.phase("variation"):
+            if self.jde:
+                # F a CR zkušebních vektorů; do F_i / CR_i se zapíší jen u úspěšných (_complete)
+                r = self.rng.random((4, self.pop_size))
+                Fs = np.where(r[0] < self.tau1, 0.1 + 0.8 * r[1], self.F_i)
+                CRs = np.where(r[2] < self.tau2, r[3], self.CR_i)
+                self._trial_F, self._trial_CR = Fs, CRs
+            else:
+                Fs, CRs = self.F, self.CR
 
+            V = self.mutate_all(self.pop, self.best, Fs)
+            return self.crossover_all(self.pop, V, CRs)
+
+    def _complete(self, U, fu, n):
+        if self.pop is None:
+            self.pop, self.fits = U, fu
+            best_idx = np.argmin(self.fits)
+            self.best = self.pop[best_idx].copy()
+            self.best_fit = self.fits[best_idx]
+            if self.jde:
+                self.F_i = np.full(self.pop_size, self.F)
+                self.CR_i = np.full(self.pop_size, self.CR)
+            return
+
+        if self._sequential:
+            with self.profiler.phase("selection"):
+                self._complete_one(U[0], fu[0], n)
+            return
+
+        pop, fits = self.pop, self.fits
+        with self.profiler.phase("selection"):
+            # výběr jen mezi skutečně vyhodnocenými jedinci
+            better = np.zeros(self.pop_size, dtype=bool)
+            better[:n] = fu[:n] <= fits[:n]
+            self.pop = np.where(better[:, None], U, pop)
+            self.fits = np.where(better, fu, fits)
+            if self.jde:
+                self.F_i = np.where(better, self._trial_F, self.F_i)
+                self.CR_i = np.where(better, self._trial_CR, self.CR_i)
+
+            if n > 0 and np.min(fu[:n]) < self.best_fit:
+                best_idx = int(np.argmin(fu[:n]))
+                self.best_fit = fu[best_idx]
+                self.best = U[best_idx].copy()
+
+    def _complete_one(self, u, fu, n):
+        """best1bin: výběr pro cíl `_target` do nové populace, nejlepší se mění hned."""
+        i = self._target
+        if n > 0 and fu <= self.fits[i]:
+            self._new_pop[i], self._new_fits[i] = u, fu
+            if self.jde:
+                self.F_i[i], self.CR_i[i] = self._trial_F, self._trial_CR
+            if fu < self.best_fit:
+                self.best_fit, self.best = fu, u.copy()
+
+        self._target += 1
+        if self._target == self.pop_size:
+            self.pop, self.fits = self._new_pop, self._new_fits
+            self._target = 0
+
+    def get_state(self):
+        """Kompletní stav běhu (populace, jDE parametry, RNG, čítač, historie)."""
+        state = {
+            "pop": self.pop, "fits": self.fits,
+            "best": self.best, "best_fit": self.best_fit,
+            "rng": self.rng.bit_generator.state,
+            "eval_count": self.eval_count,
+            "history": self.history,
+            "profiler": self.profiler,
+        }
         if self.jde:
-            F_i = np.full(self.pop_size, self.F)
-            CR_i = np.full(self.pop_size, self.CR)
-
-        self.log.append((self.eval_count, best_fit))
-
-        while self.eval_count < self.max_evals:
-            new_pop = pop.copy()
-            new_fits = fits.copy()
-
-            for i in range(self.pop_size):
-                if self.jde:
-                    if self.rng.random() < self.tau1:
-                        F_i[i] = 0.1 + 0.8 * self.rng.random()
-                    if self.rng.random() < self.tau2:
-                        CR_i[i] = self.rng.random()
-                    Fi, CRi = F_i[i], CR_i[i]
-                else:
-                    Fi, CRi = self.F, self.CR
-
-                vi = self.mutate(pop, best, i, Fi)
-                ui = self.crossover(pop[i], vi, CRi)
-                fu = self.evaluate(ui)
-
-                if fu <= fits[i]:
-                    new_pop[i] = ui
-                    new_fits[i] = fu
-                    if fu < best_fit:
-                        best_fit = fu
-                        best = ui.copy()
-
-                self.log.append((self.eval_count, best_fit))
-                if self.eval_count >= self.max_evals:
+            state["F_i"], state["CR_i"] = self.F_i, self.CR_i
+        if self._sequential and self._target > 0:
+            state["target"] = self._target
+            state["new_pop"], state["new_fits"] = self._new_pop, self._new_fits
+        return state
+
+    def set_state(self, state):
+        self.pop, self.fits = state["pop"], state["fits"]
+        self.best, self.best_fit = state["best"], state["best_fit"]
+        self.rng.bit_generator.state = state["rng"]
+        self.eval_count = state["eval_count"]
+        self.history = state["history"]
+        self.profiler = state["profiler"]
+        if self.jde:
+            self.F_i, self.CR_i = state["F_i"], state["CR_i"]
+        self._target = state.get("target", 0)
+        if self._target > 0:
+            self._new_pop, self._new_fits = state["new_pop"], state["new_fits"]
+
+    def run(self, snapshot_path=None, snapshot_every=None, snapshot_config=None):
+        """
+        Spustí DE do vyčerpání rozpočtu (nebo dosažení cílové přesnosti). Se `snapshot_path` se každých
+        `snapshot_every` evaluací atomicky uloží stav a běh pak pokračuje
+        z posledního snapshotu bit po bitu stejně. Snapshot uložený s jinou
+        `snapshot_config` (seed, parametry, rozpočet) se zahodí.
+        """
+        snap = Snapshotter(snapshot_path, snapshot_every, snapshot_config)
+        state = snap.restore()
+        if state is not None:
+            self.set_state(state)
+        snap.start(self.eval_count)
+
+        while not self.done:
+            self._step()
+            with self.profiler.phase("bookkeeping"):
+                snap.maybe_save(self.eval_count, self.get_state)
+
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.best, self.best_fit, self.history.as_array()
+
+    async def arun(self, objective):
+        """
+        Asynchronní varianta `run` nad async objektivem (`await objective.evaluate_many(X)`,
+        např. `sim_objective.SimulatorObjective`, který sám omezuje počet rozpracovaných
+        požadavků). Bez snapshotů; vrací totéž co `run`.
+        """
+        while not self.done:
+            await self._astep(objective)
+
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.best, self.best_fit, self.history.as_array()
+
+    # -----------------------------------------------------
+    # Asynchronní (steady-state) režim
+    # -----------------------------------------------------
+
+    def _trial(self, i):
+        """Zkušební vektor pro cíl i z aktuální populace (+ jeho F a CR)."""
+        if self.jde:
+            F = 0.1 + 0.8 * self.rng.random() if self.rng.random() < self.tau1 else self.F_i[i]
+            CR = self.rng.random() if self.rng.random() < self.tau2 else self.CR_i[i]
+        else:
+            F, CR = self.F, self.CR
+        v = self.mutate(self.pop, self.best, i, F)
+        return self.crossover(self.pop[i], v, CR), F, CR
+
+    def _select_one(self, i, u, fu, F, CR):
+        """Výběr jednoho výsledku; u jDE přežijí F a CR jen s úspěšným potomkem."""
+        self.eval_count += 1
+        self.history.record([fu])
+        if fu <= self.fits[i]:
+            self.pop[i], self.fits[i] = u, fu
+            if self.jde:
+                self.F_i[i], self.CR_i[i] = F, CR
+            if fu < self.best_fit:
+                self.best_fit, self.best = fu, u.copy()
+
+    def run_async(self, in_flight=None, synchronous=False):
+        """
+        Asynchronní steady-state DE nad `self.evaluator` (vlákna/procesy).
+
+        Jakmile doběhne libovolné vyhodnocení, výsledek hned projde výběrem a pro
+        další cíl (cyklicky přes populaci) se z aktuální populace vytvoří a odešle
+        nový zkušební vektor, takže pracovníci nečekají na nejpomalejšího jedince
+        generace. Současně běží nejvýše `in_flight` vyhodnocení (výchozí = počet
+        pracovníků evaluatoru) a nikdy víc, než kolik zbývá z rozpočtu.
+
+        S `synchronous=True` se stejnou cestou (a stejným měřením) běží klasická
+        generační DE: celá generace se odešle a výběr proběhne až po poslední.
+
+        Každé vyhodnocení je samostatná úloha s jedním řádkem (`evaluator.submit`);
+        `vectorized` se tu nevyužívá, vektorizovaný objektiv dostane matici (1, dim).
+        Snapshoty se v tomto režimu nepodporují. Naměřené vytížení pracovníků
+        (čas strávený ve funkci / (pracovníci × wall)) je v `self.utilization`.
+        Vrací (best, best_fit, history) jako `run`.
+        """
+        ev = self.evaluator
+        workers = getattr(ev, "workers", 1)
+        in_flight = in_flight or workers
+        NP = self.pop_size
+        start_wall = time.perf_counter()
+        busy = 0.0
+
+        with self.profiler.phase("init"):
+            self.pop = self.rng.uniform(self.lower, self.upper, (NP, self.dim))
+            self.fits = np.full(NP, np.inf)
+        n = min(NP, self.max_evals - self.eval_count)
+        futures = [ev.submit(x) for x in self.pop[:n]]
+        with self.profiler.phase("evaluation"):
+            results = [f.result() for f in futures]
+        for i, (fu, sec) in enumerate(results):
+            busy += sec
+            self.eval_count += 1
+            self.fits[i] = fu
+        self.history.record(self.fits[:n])
+
+        best_idx = int(np.argmin(self.fits))
+        self.best, self.best_fit = self.pop[best_idx].copy(), self.fits[best_idx]
+        if self.jde:
+            self.F_i = np.full(NP, self.F)
+            self.CR_i = np.full(NP, self.CR)
+
+        pending = {}
+        target = 0
+
+        def submit():
+            nonlocal target
+            with self.profiler.phase("variation"):
+                u, F, CR = self._trial(target)
+            pending[ev.submit(u)] = (target, u, F, CR)
+            target = (target + 1) % NP
+
+        def budget_left():
+            return (self.max_evals - self.eval_count - len(pending) > 0
+                    and not self.history.target_reached)
+
+        while True:
+            if synchronous:
+                target = 0
+                while len(pending) < NP and budget_left():
+                    submit()
+                if not pending:
+                    break
+                with self.profiler.phase("evaluation"):
+                    wait(pending)
+                done = sorted(pending, key=lambda f: pending[f][0])
+            else:
+                while len(pending) < in_flight and budget_left():
+                    submit()
+                if not pending:
                     break
+                with self.profiler.phase("evaluation"):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            with self.profiler.phase("selection"):
+                for fut in done:
+                    i, u, F, CR = pending.pop(fut)
+                    fu, sec = fut.result()
+                    busy += sec
+                    self._select_one(i, u, fu, F, CR)
 
-            pop, fits = new_pop, new_fits
+        wall = time.perf_counter() - start_wall
+        self.utilization = {
+            "mode": "sync" if synchronous else "async",
+            "workers": workers,
+            "in_flight": NP if synchronous else in_flight,
+            "wall_sec": wall,
+            "busy_sec": busy,
+            "utilization": busy / (workers * wall) if wall > 0 else 0.0,
+        }
 
-        return best, best_fit, np.array(self.log)
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.best, self.best_fit, self.history.as_array()
 
     def plot_convergence(self, label, out_path=None):
-        log = np.array(self.log)
+        log = self.history.as_array()
         plt.figure()
         plt.plot(log[:, 0], log[:, 1], label=label)
         plt.yscale("log")
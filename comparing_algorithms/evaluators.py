@@ -0,0 +1,173 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+# Evaluation backends. An evaluator takes an (N, dim) matrix and returns the N
+# objective values in row order; the optimizers decide how many rows to send
+# (never more than the remaining budget), so evaluation counting stays exact.
+# `submit(x)` evaluates one vector asynchronously; its future resolves to
+# (value, seconds spent in the worker), which is used to measure utilization.
+# With `vectorized=True` the objective only takes (n, dim) matrices: pools then
+# send whole chunks of rows and `submit` passes a (1, dim) matrix.
+
+EVALUATORS = ("serial", "thread", "process")
+
+
+def _timed_call(func, x):
+    start = time.perf_counter()
+    value = func(x)
+    return float(value), time.perf_counter() - start
+
+
+def _call_row(func, x, vectorized):
+    return func(x[None, :])[0] if vectorized else func(x)
+
+
+def _chunks(X, n):
+    return [c for c in np.array_split(X, min(n, len(X))) if len(c)]
+
+
+class SerialEvaluator:
+    """Evaluate in the calling thread (one vectorized call or one call per row)."""
+
+    workers = 1
+
+    def __init__(self, func, vectorized=False):
+        self.func = func
+        self.vectorized = vectorized
+
+    def __call__(self, X):
+        if self.vectorized:
+            return np.asarray(self.func(X), dtype=float)
+        return np.array([self.func(x) for x in X], dtype=float)
+
+    def _row_func(self, x):
+        return _call_row(self.func, x, self.vectorized)
+
+    def submit(self, x):
+        """Evaluate right away; the returned future is already done."""
+        fut = Future()
+        fut.set_result(_timed_call(self._row_func, x))
+        return fut
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ThreadPoolEvaluator(SerialEvaluator):
+    """One row per task on a thread pool (one matrix chunk per worker when
+    `vectorized`); for objectives that release the GIL (external simulator
+    processes, I/O, numpy-heavy code)."""
+
+    def __init__(self, func, workers=None, vectorized=False):
+        super().__init__(func, vectorized)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def __call__(self, X):
+        if len(X) == 0:
+            return np.empty(0)
+        if self.vectorized:
+            parts = self.pool.map(lambda c: np.asarray(self.func(c), dtype=float), _chunks(X, self.workers))
+            return np.concatenate(list(parts))
+        return np.fromiter(self.pool.map(self.func, X), dtype=float, count=len(X))
+
+    def submit(self, x):
+        return self.pool.submit(_timed_call, self._row_func, x)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+# --- process pool: the objective lives in the worker, tasks carry only the rows ---
+
+_worker_func = None
+_worker_vectorized = False
+
+
+def _init_worker(func, setup, setup_args, vectorized=False):
+    global _worker_func, _worker_vectorized
+    _worker_func = func
+    _worker_vectorized = vectorized
+    if setup is not None:
+        setup(*setup_args)
+
+
+def _call_worker(x):
+    return _worker_func(x)
+
+
+def _call_worker_chunk(X):
+    return np.asarray(_worker_func(X), dtype=float)
+
+
+def _call_worker_row(x):
+    return _call_row(_worker_func, x, _worker_vectorized)
+
+
+def _call_worker_timed(x):
+    return _timed_call(_call_worker_row, x)
+
+
+class ProcessPoolEvaluator(SerialEvaluator):
+    """Persistent worker processes, each initialized once with the objective.
+
+    Args:
+        func: Picklable (module-level) objective of one vector.
+        workers: Number of processes (None = number of cores).
+        setup: Optional function run once in every worker before the first task,
+            e.g. to load data or start a simulator; `setup_args` are its arguments.
+        chunksize: Rows per task (None = about 4 tasks per worker per call).
+        vectorized: `func` takes an (n, dim) matrix; each task then is one matrix
+            of rows (one per worker unless `chunksize` is set).
+    """
+
+    def __init__(self, func, workers=None, setup=None, setup_args=(), chunksize=None,
+                 vectorized=False):
+        super().__init__(func, vectorized)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(func, setup, setup_args, vectorized))
+
+    def __call__(self, X):
+        if len(X) == 0:
+            return np.empty(0)
+        if self.vectorized:
+            n_chunks = -(-len(X) // self.chunksize) if self.chunksize else self.workers
+            return np.concatenate(list(self.pool.map(_call_worker_chunk, _chunks(X, n_chunks))))
+        chunksize = self.chunksize or max(1, len(X) // (4 * self.workers))
+        return np.fromiter(self.pool.map(_call_worker, X, chunksize=chunksize),
+                           dtype=float, count=len(X))
+
+    def submit(self, x):
+        return self.pool.submit(_call_worker_timed, x)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def make_evaluator(evaluator, func, vectorized=False):
+    """Evaluator for an optimizer: None / "serial" / "thread" / "process" or a ready instance.
+
+    Pools created here use all cores; create the evaluator yourself to set
+    `workers` or a worker `setup`.
+    """
+    if evaluator is None or evaluator == "serial":
+        return SerialEvaluator(func, vectorized)
+    if evaluator == "thread":
+        return ThreadPoolEvaluator(func, vectorized=vectorized)
+    if evaluator == "process":
+        return ProcessPoolEvaluator(func, vectorized=vectorized)
+    if isinstance(evaluator, str):
+        raise ValueError(f"Neznámý evaluator {evaluator!r} (známé: {EVALUATORS})")
+    return evaluator
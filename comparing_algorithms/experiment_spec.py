@@ -0,0 +1,153 @@
+import json
+import inspect
+
+from ga_core import GAReal
+from de_core import DifferentialEvolution
+from pso_core import PSO
+
+DEFAULT_SPEC_PATH = "experiment.json"
+
+ALGORITHM_CLASSES = {
+    "GAReal": GAReal,
+    "DifferentialEvolution": DifferentialEvolution,
+    "PSO": PSO,
+}
+
+# Arguments filled in by the runner, not by the spec.
+RUNNER_ARGS = {
+    "func", "dim", "bounds", "lower", "upper", "max_evals", "max_fes", "seed", "vectorized",
+    "record", "checkpoints", "profile", "f_opt", "target_eps",
+}
+
+# Allowed values of string parameters.
+CHOICES = {
+    "strategy": {"rand1bin", "best1bin", "best1bin_batch"},
+    "topology": {"global", "ring"},
+    "w_strategy": {"linear", "const"},
+    "evaluator": {"serial", "thread", "process"},
+    "selection": {"roulette", "rank", "tournament"},
+}
+
+SPEC_KEYS = {"runs", "dims", "evals_per_dim", "problems", "algorithms"}
+
+
+class SpecError(ValueError):
+    """Invalid experiment spec; the message lists every problem found."""
+
+
+def load_spec(path=DEFAULT_SPEC_PATH, problems=None):
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    validate_spec(spec, problems)
+    return spec
+
+
+def _check_param(cls, name, value):
+    params = inspect.signature(cls.__init__).parameters
+    if name in RUNNER_ARGS:
+        return f"parametr '{name}' nastavuje runner, ve specifikaci nesmí být"
+    if name not in params:
+        return f"neznámý parametr '{name}' pro {cls.__name__}"
+
+    default = params[name].default
+    if name in CHOICES and value not in CHOICES[name]:
+        return f"'{name}' musí být jedno z {sorted(CHOICES[name])}, ne {value!r}"
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            return f"'{name}' musí být true/false, ne {value!r}"
+    elif isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f"'{name}' musí být číslo, ne {value!r}"
+    return None
+
+
+def validate_spec(spec, problems=None):
+    """Check the whole spec up front and raise SpecError listing all problems.
+
+    Args:
+        spec: Parsed spec dict.
+        problems: Known problem names (None skips the check).
+    """
+    errors = []
+
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        errors.append(f"neznámé klíče: {sorted(unknown)}")
+    missing = SPEC_KEYS - set(spec)
+    if missing:
+        errors.append(f"chybí klíče: {sorted(missing)}")
+
+    for key in ("runs", "evals_per_dim"):
+        if key in spec and (not isinstance(spec[key], int) or isinstance(spec[key], bool) or spec[key] < 1):
+            errors.append(f"'{key}' musí být kladné celé číslo")
+
+    dims = spec.get("dims", [])
+    if not isinstance(dims, list) or not dims or not all(isinstance(d, int) and d >= 2 for d in dims):
+        errors.append("'dims' musí být neprázdný seznam celých čísel >= 2")
+
+    if problems is not None:
+        for fname in spec.get("problems", []):
+            if fname not in problems:
+                errors.append(f"neznámý problém '{fname}' (známé: {sorted(problems)})")
+
+    algorithms = spec.get("algorithms", {})
+    if not isinstance(algorithms, dict) or not algorithms:
+        errors.append("'algorithms' musí být neprázdný objekt")
+        algorithms = {}
+
+    for algo_name, entry in algorithms.items():
+        if not isinstance(entry, dict) or set(entry) - {"class", "params"}:
+            errors.append(f"{algo_name}: položka musí mít jen klíče 'class' a 'params'")
+            continue
+        cls = ALGORITHM_CLASSES.get(entry.get("class"))
+        if cls is None:
+            errors.append(f"{algo_name}: neznámá třída {entry.get('class')!r} "
+                          f"(známé: {sorted(ALGORITHM_CLASSES)})")
+            continue
+        for name, value in entry.get("params", {}).items():
+            msg = _check_param(cls, name, value)
+            if msg:
+                errors.append(f"{algo_name}: {msg}")
+
+    if errors:
+        raise SpecError("Chybná specifikace experimentu:\n  - " + "\n  - ".join(errors))
+
+
+def make_factory(entry):
+    """Factory (func, dim, bounds, max_evals, seed, **opts) -> optimizer for one spec entry."""
+    cls = ALGORITHM_CLASSES[entry["class"]]
+    params = dict(entry.get("params", {}))
+
+    def factory(func, dim, bounds, max_evals, seed, **opts):
+        if cls is PSO:
+            return PSO(func=func, dim=dim, lower=bounds[0], upper=bounds[1],
+                       max_fes=max_evals, vectorized=True, seed=seed, **params, **opts)
+        return cls(func=func, dim=dim, bounds=bounds, max_evals=max_evals,
+                   vectorized=True, seed=seed, **params, **opts)
+
+    return factory
+
+
+def select(spec, dims=None, problems=None, algos=None, runs=None):
+    """Subset of the spec grid to compute; every filter value must exist in the spec.
+
+    Returns a dict with keys dims, problems, algos, runs (None filters = everything).
+    """
+    errors = []
+    for label, values, available in (("dims", dims, spec["dims"]),
+                                     ("problems", problems, spec["problems"]),
+                                     ("algos", algos, list(spec["algorithms"]))):
+        for v in values or []:
+            if v not in available:
+                errors.append(f"--{label}: {v!r} není ve specifikaci (dostupné: {available})")
+    if runs is not None and runs < 1:
+        errors.append("--runs musí být >= 1")
+    if errors:
+        raise SpecError("Chybný výběr:\n  - " + "\n  - ".join(errors))
+
+    return {
+        "dims": [d for d in spec["dims"] if not dims or d in dims],
+        "problems": [p for p in spec["problems"] if not problems or p in problems],
+        "algos": [a for a in spec["algorithms"] if not algos or a in algos],
+        "runs": spec["runs"] if runs is None else runs,
+    }
@@ -1,18 +1,41 @@
 import numpy as np
 
+from recorder import HistoryRecorder
+from snapshot import Snapshotter
+from profiling import make_profiler
+from evaluators import make_evaluator
+from ask_tell import AskTellMixin
+from selection import select
 
-class GAReal:
+
+class GAReal(AskTellMixin):
     """Genetic algorithm for continuous (real-valued) optimization.
 
+    Can be driven by `run()` or step by step through `ask()` / `tell()` (see AskTellMixin).
+
     Args:
         func: Objective function to minimize. Accepts a 1D numpy array and returns a scalar.
         dim: Dimensionality of the search space.
         bounds: Tuple (low, high) specifying variable bounds (scalars or arrays).
         pop_size: Population size.
         max_evals: Maximum number of function evaluations.
-        elite_frac: Fraction of population preserved as elite (not used in current implementation).
+        elite_frac: Fraction of the population carried over unchanged (and not
+            re-evaluated) into the next generation; at least one child is bred.
         p_mut: Per-variable mutation probability.
         sigma_frac: Fraction of the search range used as Gaussian mutation sigma.
+        selection: Parent selection, "rank" (default), "roulette" or "tournament"
+            (see selection.py).
+        tournament_size: Individuals per tournament for "tournament" selection.
+        vectorized: If True, `func` takes an (N, dim) matrix and returns N values,
+            so a whole population is evaluated in one call.
+        evaluator: Backend evaluating a population, "serial" (default), "thread",
+            "process" or an evaluator instance (see evaluators.py). Pools created
+            from a name are shut down at the end of `run`.
+        record: History policy, "improvement" or "checkpoints" (see HistoryRecorder).
+        checkpoints: FES grid for the "checkpoints" policy (None = CEC fractions).
+        profile: If True, accumulate wall/CPU time per phase in `self.profiler`.
+        f_opt: Known optimum; enables recording of FES needed per precision level.
+        target_eps: Stop once `best - f_opt < target_eps` (requires `f_opt`).
         seed: RNG seed or None.
     """
 
@@ -26,6 +49,15 @@ class GAReal:
         elite_frac=0.1,
         p_mut=0.1,
         sigma_frac=0.05,
+        selection="rank",
+        tournament_size=2,
+        vectorized=False,
+        evaluator=None,
+        record="improvement",
+        checkpoints=None,
+        profile=False,
+        f_opt=None,
+        target_eps=None,
         seed=None,
     ):
         self.func = func
@@ -34,26 +66,27 @@ class GAReal:
         self.pop_size = pop_size
         self.max_evals = max_evals
         self.elite_frac = elite_frac
+        self.n_elite = max(0, min(pop_size - 1, int(round(elite_frac * pop_size))))
         self.p_mut = p_mut
         self.sigma_frac = sigma_frac
+        self.selection = selection
+        self.tournament_size = tournament_size
+        self.vectorized = vectorized
+        self.evaluator = make_evaluator(evaluator, func, vectorized)
+        self._owns_evaluator = isinstance(evaluator, str)
 
         self.rng = np.random.default_rng(seed)
         self.eval_count = 0
+        self.pop = None
+        self.fitness = None
+        self.history = HistoryRecorder(max_evals, record, checkpoints,
+                                       f_opt=f_opt, stop_eps=target_eps)
+        self.profiler = make_profiler(profile)
 
     def _ensure_bounds(self, x):
         """Clip a solution vector to the provided bounds and return the clipped array."""
         return np.clip(x, self.low, self.high)
 
-    def _eval(self, x):
-        """Evaluate the objective function if evaluation budget remains.
-
-        Returns +inf when the evaluation budget is exhausted to signal an invalid/very bad solution.
-        """
-        if self.eval_count >= self.max_evals:
-            return np.inf
-        self.eval_count += 1
-        return self.func(x)
-
     def _init_pop(self):
         """Initialize the population uniformly within the bounds.
 
@@ -61,64 +94,117 @@ class GAReal:
         """
         return self.rng.uniform(self.low, self.high, (self.pop_size, self.dim))
 
-    def _rank_selection(self, fitness):
-        """Select a single individual index using rank-based probabilities.
+    def _select_parents(self, n):
+        """Indices of `n` parents drawn at once (weights computed once per generation)."""
+        return select(self.selection, self.fitness, n, self.rng, minimize=True,
+                      tournament_size=self.tournament_size)
 
-        The selection probabilities favor better-ranked (lower fitness) individuals.
-        """
-        ranks = np.argsort(fitness)
-        probs = np.linspace(1, len(fitness), len(fitness))
-        probs = probs / np.sum(probs)
-        return self.rng.choice(ranks, p=probs[::-1])
-
-    def _crossover(self, p1, p2):
-        """Perform one-point crossover between two parents and return two offspring."""
-        point = self.rng.integers(1, self.dim)
-        c1 = np.concatenate([p1[:point], p2[point:]])
-        c2 = np.concatenate([p2[:point], p1[point:]])
-        return c1, c2
-
-    def _mutate_gauss(self, x):
-        """Apply per-variable Gaussian mutation to a solution and ensure bounds.
-
-        Each variable is mutated with probability `p_mut` using a Gaussian with
-        standard deviation `sigma_frac * (high - low)`.
-        """
-        sigma = self.sigma_frac * (self.high - self.low)
-        for i in range(self.dim):
-            if self.rng.random() < self.p_mut:
-                x[i] += self.rng.normal(0.0, sigma)
-        return self._ensure_bounds(x)
+    def _offspring(self, n):
+        """Breed `n` children from the current population in a few array operations.
 
-    def run(self, sample_step=100):
-        """Run the genetic algorithm until the evaluation budget is exhausted.
+        Parent pairs are selected in one batch, one-point crossover takes the genes
+        left of each pair's cut point from the first parent (a broadcast mask), and
+        Gaussian mutation is applied to the whole offspring matrix.
+        """
+        pairs = (n + 1) // 2
+        parents = self.pop[self._select_parents(2 * pairs)].reshape(pairs, 2, self.dim)
+        p1, p2 = parents[:, 0], parents[:, 1]
+
+        if self.dim > 1:
+            cut = self.rng.integers(1, self.dim, size=pairs)
+            left = np.arange(self.dim) < cut[:, None]
+        else:
+            left = np.ones((pairs, self.dim), dtype=bool)
+        children = np.concatenate([np.where(left, p1, p2), np.where(left, p2, p1)])[:n]
+
+        sigma = self.sigma_frac * (np.asarray(self.high) - np.asarray(self.low))
+        mutate = self.rng.random(children.shape) < self.p_mut
+        children += mutate * self.rng.normal(0.0, 1.0, children.shape) * sigma
+        return self._ensure_bounds(children)
+
+    def _propose(self):
+        """Candidates of the next generation: the initial population first, then
+        the `pop_size - n_elite` children (the elites keep their known fitness)."""
+        if self.pop is None:
+            with self.profiler.phase("init"):
+                return self._init_pop()
+        with self.profiler.phase("variation"):
+            return self._offspring(self.pop_size - self.n_elite)
+
+    def _complete(self, X, fvals, n):
+        if self.pop is None:
+            self.pop, self.fitness = X, fvals
+            return
+        with self.profiler.phase("selection"):
+            elite = np.argsort(self.fitness, kind="stable")[:self.n_elite]
+            self.pop = np.concatenate([self.pop[elite], X])
+            self.fitness = np.concatenate([self.fitness[elite], fvals])
+
+    def get_state(self):
+        """Return everything needed to continue the run bit-identically."""
+        return {
+            "pop": self.pop,
+            "fitness": self.fitness,
+            "rng": self.rng.bit_generator.state,
+            "eval_count": self.eval_count,
+            "history": self.history,
+            "profiler": self.profiler,
+        }
+
+    def set_state(self, state):
+        """Restore a state returned by `get_state`."""
+        self.pop = state["pop"]
+        self.fitness = state["fitness"]
+        self.rng.bit_generator.state = state["rng"]
+        self.eval_count = state["eval_count"]
+        self.history = state["history"]
+        self.profiler = state["profiler"]
+
+    def run(self, snapshot_path=None, snapshot_every=None, snapshot_config=None):
+        """Run the genetic algorithm until the budget is exhausted or the target is reached.
 
         Args:
-            sample_step: Interval (in function evaluations) at which to record progress.
+            snapshot_path: File for periodic state snapshots; an existing snapshot is
+                resumed from. None disables snapshots.
+            snapshot_every: Snapshot interval in function evaluations.
+            snapshot_config: Configuration of the run (seed, parameters, budget); a
+                snapshot saved under a different one is discarded, not resumed.
 
         Returns:
             A tuple (best_fit, history) where `best_fit` is the best objective value found
-            and `history` is a list of (eval_count, best_fit) samples.
+            and `history` is an (n, 2) array of (eval_count, best_fit) recorded
+            according to the `record` policy.
         """
-        pop = self._init_pop()
-        fitness = np.array([self._eval(ind) for ind in pop])
-        best_fit = float(np.min(fitness))
+        snap = Snapshotter(snapshot_path, snapshot_every, snapshot_config)
+        state = snap.restore()
+        if state is not None:
+            self.set_state(state)
+        snap.start(self.eval_count)
 
-        history = []
-        history.append((self.eval_count, best_fit))
+        while not self.done:
+            self._step()
+            with self.profiler.phase("bookkeeping"):
+                snap.maybe_save(self.eval_count, self.get_state)
 
-        while self.eval_count < self.max_evals:
-            for i, ind in enumerate(pop):
-                val = self._eval(ind)
-                fitness[i] = val
-                if val < best_fit:
-                    best_fit = float(val)
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.history.best, self.history.as_array()
 
-                if self.eval_count % sample_step == 0:
-                    history.append((self.eval_count, best_fit))
+    async def arun(self, objective):
+        """Async variant of `run` evaluating on an async objective (no snapshots).
 
-                if self.eval_count >= self.max_evals:
-                    break
+        Args:
+            objective: Object with `await objective.evaluate_many(X)`, e.g. a
+                `sim_objective.SimulatorObjective`; it bounds the requests in flight.
 
-        return best_fit, history
+        Returns:
+            The same tuple (best_fit, history) as `run`.
+        """
+        while not self.done:
+            await self._astep(objective)
 
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.history.best, self.history.as_array()
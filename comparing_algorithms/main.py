@@ -1,207 +1,156 @@
 import os
-import csv
+import sys
 import time
+import zlib
+import json
+import sqlite3
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 import matplotlib.pyplot as plt
 
 from ga_core import GAReal
-from de_core import DifferentialEvolution
-from pso_core import PSO
+from experiment_spec import DEFAULT_SPEC_PATH, SpecError, load_spec, make_factory, select
+from results_db import ResultsDB
+from work_queue import QUEUE_PATH, WorkQueue, work
+from manifest import Manifest
+from curve_stats import CurveAggregator
+from recorder import checkpoint_grid, best_at, PRECISIONS
+from profiling import PHASES
 
 
 # ---------------------------------------------------------
 # Testovací funkce
 # ---------------------------------------------------------
 
+# All functions accept either a single vector of shape (D,) or a whole
+# population of shape (N, D) and then return N values.
+
 def sphere(x):
-    return np.sum(x ** 2)
+    return np.sum(x ** 2, axis=-1)
 
 
 def rosenbrock(x):
     return np.sum(
-        100 * (x[1:] - x[:-1] ** 2) ** 2 +
-        (1 - x[:-1]) ** 2
+        100 * (x[..., 1:] - x[..., :-1] ** 2) ** 2 +
+        (1 - x[..., :-1]) ** 2,
+        axis=-1
     )
 
 
 def schwefel(x):
-    return 418.9829 * len(x) - np.sum(
-        x * np.sin(np.sqrt(np.abs(x)))
+    return 418.9829 * x.shape[-1] - np.sum(
+        x * np.sin(np.sqrt(np.abs(x))), axis=-1
     )
 
 def rastrigin(x):
     A = 10
-    return A * len(x) + np.sum(x**2 - A * np.cos(2 * np.pi * x))
+    return A * x.shape[-1] + np.sum(x**2 - A * np.cos(2 * np.pi * x), axis=-1)
 
+# x_opt: every coordinate of the global optimum (used to get f* for any dimension)
 PROBLEMS = {
-    "sphere":     {"fn": sphere,     "bounds": (-5.12, 5.12)},
-    "rosenbrock": {"fn": rosenbrock, "bounds": (-5.0, 10.0)},
-    "schwefel":   {"fn": schwefel,   "bounds": (-500.0, 500.0)},
-    "rastrigin": {"fn": rastrigin, "bounds": (-5.12, 5.12)},
+    "sphere":     {"fn": sphere,     "bounds": (-5.12, 5.12),    "x_opt": 0.0},
+    "rosenbrock": {"fn": rosenbrock, "bounds": (-5.0, 10.0),     "x_opt": 1.0},
+    "schwefel":   {"fn": schwefel,   "bounds": (-500.0, 500.0),  "x_opt": 420.9687462275036},
+    "rastrigin": {"fn": rastrigin, "bounds": (-5.12, 5.12), "x_opt": 0.0},
 }
 
 
+def f_opt(fname, dim):
+    """Known optimal value of a problem (schwefel's is not exactly 0 with 418.9829)."""
+    pdata = PROBLEMS[fname]
+    return float(pdata["fn"](np.full(dim, pdata["x_opt"])))
+
+
+# All results (runs, seeds, timings, histories) are kept in results/results.db
+# (results_db.py); the old one-CSV-per-run history files are only written on request.
+EXPORT_HISTORY_CSV = False
+
+# Histories are recorded on the same FES grid for every algorithm (1 %, 2 %, ... of
+# the budget, which includes the CEC reporting points), so the curves line up.
+RECORD_FRACTIONS = np.linspace(0.01, 1.0, 100)
+
+
+# Convergence charts: mean curve (solid) plus median (dashed) and IQR band per algorithm.
+CHART_BANDS = True
+
+
+# Long runs save their state every SNAPSHOT_EVERY evaluations and a killed
+# run continues from the last snapshot (bit-identically).
+SNAPSHOT_DIR = "results/snapshots"
+SNAPSHOT_EVERY = 20_000
+
+
+# Per-phase wall/CPU times of every run (profiling.py), stored next to runtime_sec.
+PROFILE = True
+
+
+# CEC-style target stop: a run ends once best - f* < TARGET_EPS. Off by default
+# (None = every run spends the full budget, so final values and curves cover it);
+# with a value, stopped runs report their last best and shorter curves. FES to the
+# precisions in recorder.PRECISIONS are recorded either way.
+TARGET_EPS = None
+
+
+def run_options(fname, dim, max_evals):
+    """Options passed to every algorithm factory (recording, profiling, target stop)."""
+    return {"record": "checkpoints",
+            "checkpoints": checkpoint_grid(max_evals, RECORD_FRACTIONS),
+            "profile": PROFILE,
+            "f_opt": f_opt(fname, dim),
+            "target_eps": TARGET_EPS}
+
+
 # ---------------------------------------------------------
 # Directory setup
 # ---------------------------------------------------------
 
 def ensure_dirs():
-    os.makedirs("results/raw", exist_ok=True)
+    os.makedirs("results", exist_ok=True)
     os.makedirs("tables", exist_ok=True)
     os.makedirs("charts", exist_ok=True)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
 
 
 # ---------------------------------------------------------
 # Algorithm factories
 # ---------------------------------------------------------
 
-def make_algorithms():
-    def ga_factory(func, dim, bounds, max_evals, seed):
-        return GAReal(
-            func=func,
-            dim=dim,
-            bounds=bounds,
-            pop_size=200,
-            max_evals=max_evals,
-            elite_frac=0.1,
-            p_mut=0.1,
-            sigma_frac=0.05,
-            seed=seed,
-        )
-
-    def de_rand_factory(func, dim, bounds, max_evals, seed):
-        return DifferentialEvolution(
-            func=func, dim=dim, bounds=bounds,
-            pop_size=50, max_evals=max_evals,
-            strategy="rand1bin", F=0.5, CR=0.8,
-            jde=False, seed=seed,
-        )
-
-    def de_best_factory(func, dim, bounds, max_evals, seed):
-        return DifferentialEvolution(
-            func=func, dim=dim, bounds=bounds,
-            pop_size=50, max_evals=max_evals,
-            strategy="best1bin", F=0.5, CR=0.8,
-            jde=False, seed=seed,
-        )
-
-    def jde_factory(func, dim, bounds, max_evals, seed):
-        return DifferentialEvolution(
-            func=func, dim=dim, bounds=bounds,
-            pop_size=50, max_evals=max_evals,
-            strategy="rand1bin", F=0.5, CR=0.9,
-            jde=True, tau1=0.1, tau2=0.1,
-            seed=seed,
-        )
-
-    def pso_linear_factory(func, dim, bounds, max_evals, seed):
-        return PSO(
-            func=func, dim=dim,
-            lower=bounds[0], upper=bounds[1],
-            npop=40, max_fes=max_evals,
-            w_strategy="linear", w_max=0.8, w_min=0.3,
-            c1=2.0, c2=2.0,
-            topology="global",
-            seed=seed,
-        )
-
-    def pso_const_global_factory(func, dim, bounds, max_evals, seed):
-        return PSO(
-            func=func, dim=dim,
-            lower=bounds[0], upper=bounds[1],
-            npop=40, max_fes=max_evals,
-            w_strategy="const", w_const=0.7,
-            c1=1.49618, c2=1.49618,
-            topology="global",
-            seed=seed,
-        )
-
-    def pso_const_ring_factory(func, dim, bounds, max_evals, seed):
-        return PSO(
-            func=func, dim=dim,
-            lower=bounds[0], upper=bounds[1],
-            npop=40, max_fes=max_evals,
-            w_strategy="const", w_const=0.6,
-            c1=1.49618, c2=1.49618,
-            topology="ring",
-            seed=seed,
-        )
-
-    algorithms = {
-        "GA_real_gauss": ga_factory,
-        "DE_rand1bin": de_rand_factory,
-        "DE_best1bin": de_best_factory,
-        "jDE_rand1bin": jde_factory,
-        "PSO_linear_global": pso_linear_factory,
-        "PSO_const_global": pso_const_global_factory,
-        "PSO_const_ring": pso_const_ring_factory,
-    }
-
-    return algorithms
-
-
-# ---------------------------------------------------------
-# CSV helper functions
-# ---------------------------------------------------------
-
-def load_existing_runs(path):
-    if not os.path.exists(path):
-        return []
-    values = []
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            values.append(float(row["best_value"]))
-    return values
-
-
-def append_csv(path, run_id, best_value, runtime_sec):
-    file_exists = os.path.exists(path)
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["run", "best_value", "runtime_sec"])
-        writer.writerow([run_id, best_value, runtime_sec])
+def make_algorithms(spec=None):
+    """Algorithm factories (func, dim, bounds, max_evals, seed, **opts) from the experiment spec."""
+    if spec is None:
+        spec = load_spec(DEFAULT_SPEC_PATH, PROBLEMS)
+    return {name: make_factory(entry) for name, entry in spec["algorithms"].items()}
 
 
 # ---------------------------------------------------------
 # Convergence graph for ONE function+dimension
 # ---------------------------------------------------------
 
-def generate_convergence_chart_single(dim, fname):
-    algorithms = list(make_algorithms().keys())
+def generate_convergence_chart_single(dim, fname, db, spec=None):
+    spec = spec or load_spec(DEFAULT_SPEC_PATH, PROBLEMS)
+    algorithms = list(spec["algorithms"])
 
     plt.figure(figsize=(10, 6))
 
-    for algo_name in algorithms:
-        histories = []
+    xs = checkpoint_grid(spec["evals_per_dim"] * dim, RECORD_FRACTIONS)
 
-        # load all histories
-        for run_id in range(11):
-            hist_path = f"results/raw/D{dim}_{fname}_{algo_name}_run{run_id}_history.csv"
-            if not os.path.exists(hist_path):
-                continue
-
-            evals, vals = [], []
-            with open(hist_path, "r") as f:
-                next(f)
-                for line in f:
-                    e, v = line.strip().split(",")
-                    evals.append(float(e))
-                    vals.append(float(v))
-
-            histories.append((evals, vals))
+    for algo_name in algorithms:
+        # runs are streamed from the database, only the aggregates stay in memory
+        agg = CurveAggregator(xs)
+        for _, h in db.iter_histories(dim, fname, algo_name):
+            if len(h) > 0:
+                agg.add(best_at(h, xs))
 
-        if len(histories) == 0:
+        if agg.n == 0:
             continue
 
-        min_len = min(len(h[0]) for h in histories)
-        xs = histories[0][0][:min_len]
-        matrix = np.array([h[1][:min_len] for h in histories])
-
-        mean_curve = matrix.mean(axis=0)
-
-        plt.plot(xs, mean_curve, label=algo_name, linewidth=2)
+        line, = plt.plot(xs, agg.mean, label=algo_name, linewidth=2)
+        if CHART_BANDS:
+            q25, q75 = agg.iqr_band()
+            plt.plot(xs, agg.median, color=line.get_color(), linewidth=1, linestyle="--")
+            plt.fill_between(xs, q25, q75, color=line.get_color(), alpha=0.15, linewidth=0)
 
     plt.title(f"Convergence – D={dim}, function={fname}")
     plt.xlabel("FES")
@@ -222,27 +171,19 @@ def generate_convergence_chart_single(dim, fname):
 # Summary for ONE function+dimension
 # ---------------------------------------------------------
 
-def save_summary_single(dim, fname):
-    algorithms = list(make_algorithms().keys())
+def save_summary_single(dim, fname, db, spec=None):
+    spec = spec or load_spec(DEFAULT_SPEC_PATH, PROBLEMS)
+    algorithms = list(spec["algorithms"])
     out_path = f"tables/D{dim}_{fname}_summary.md"
 
     stats = []  # (algo_name, mean, std, median, min, max, mean_time)
 
     # načteme data
     for algo_name in algorithms:
-        csv_path = f"results/raw/D{dim}_{fname}_{algo_name}.csv"
-        if not os.path.exists(csv_path):
+        vals, times = db.best_and_times(dim, fname, algo_name)
+        if len(vals) == 0:
             continue
 
-        vals, times = [], []
-        with open(csv_path, "r") as fcsv:
-            reader = csv.DictReader(fcsv)
-            for row in reader:
-                vals.append(float(row["best_value"]))
-                times.append(float(row["runtime_sec"]))
-
-        vals, times = np.array(vals), np.array(times)
-
         stats.append((
             algo_name,
             vals.mean(),
@@ -281,75 +222,348 @@ def save_summary_single(dim, fname):
                     f"{amin:.6e} | {amax:.6e} | {mean_time:.2f} |\n"
                 )
 
+        # úspěšnost a ERT pro jednotlivé přesnosti (jen pokud je známo f*)
+        erts = [(a, db.ert(dim, fname, a)) for a in algorithms]
+        erts = [(a, e) for a, e in erts if e]
+        if erts:
+            f.write("\n**Success rate / ERT [FES] to reach best − f\\* < ε**\n\n")
+            f.write("| Algorithm | " + " | ".join(f"ε={p:.0e}" for p in PRECISIONS) + " |\n")
+            f.write("|-----------|" + "|".join("------" for _ in PRECISIONS) + "|\n")
+            for algo_name, ert in erts:
+                cells = " | ".join(
+                    f"{ert[p][0]:.2f} / {ert[p][1]:.0f}" if np.isfinite(ert[p][1]) else f"{ert[p][0]:.2f} / –"
+                    for p in PRECISIONS
+                )
+                f.write(f"| {algo_name} | {cells} |\n")
+
+        # rozpad času podle fází (jen pokud byly běhy profilovány)
+        profiles = [(a, db.mean_profile(dim, fname, a)) for a in algorithms]
+        profiles = [(a, p) for a, p in profiles if p]
+        if profiles:
+            f.write("\n**Time per phase – mean wall [s] (CPU [s])**\n\n")
+            f.write("| Algorithm | " + " | ".join(PHASES) + " |\n")
+            f.write("|-----------|" + "|".join("-" * (len(p) + 2) for p in PHASES) + "|\n")
+            for algo_name, prof in profiles:
+                cells = " | ".join(f"{prof[f'wall_{p}']:.3f} ({prof[f'cpu_{p}']:.3f})" for p in PHASES)
+                f.write(f"| {algo_name} | {cells} |\n")
+
     print(f"  → Tabulka hotova (best bold): {out_path}")
 
 
 
 # ---------------------------------------------------------
-# Main Experiment Loop
+# Seeding + single experiment cell
 # ---------------------------------------------------------
 
-def run_experiments(runs=11):
-    ensure_dirs()
-    rng = np.random.default_rng(12345)
-    algorithms = make_algorithms()
-    dims = [10, 20]
+BASE_SEED = 12345
+
+
+def _name_key(name):
+    """Stable 32-bit key of a name (independent of dict order and PYTHONHASHSEED)."""
+    return zlib.crc32(name.encode("utf-8"))
+
+
+def cell_seed(dim, fname, algo_name, run_id):
+    """Seed of one (dim, problem, algorithm, run) cell.
 
-    for dim in dims:
-        max_evals = 10_000 * dim
-        print(f"\n===== D = {dim} – max evals = {max_evals} =====")
+    The seed is derived from a SeedSequence whose spawn key is the identity of the
+    cell, so it does not depend on the order in which cells are executed.
+    """
+    ss = np.random.SeedSequence(
+        entropy=BASE_SEED,
+        spawn_key=(dim, _name_key(fname), _name_key(algo_name), run_id),
+    )
+    return int(ss.generate_state(1, dtype=np.uint64)[0])
+
+
+def snapshot_path(dim, fname, algo_name, run_id):
+    return f"{SNAPSHOT_DIR}/D{dim}_{fname}_{algo_name}_run{run_id}.pkl"
+
+
+def run_cell(dim, fname, algo_name, run_id, spec):
+    """Run one optimizer run. Top-level so that it can be sent to a worker process."""
+    pdata = PROBLEMS[fname]
+    factory = make_factory(spec["algorithms"][algo_name])
+    max_evals = spec["evals_per_dim"] * dim
+    seed = cell_seed(dim, fname, algo_name, run_id)
+
+    options = run_options(fname, dim, max_evals)
+    opt = factory(pdata["fn"], dim, pdata["bounds"], max_evals, seed, **options)
+
+    # a snapshot left by a run with another spec / seed / budget is not resumed
+    config = {"seed": seed, "params": spec["algorithms"][algo_name],
+              "max_evals": max_evals, "options": options}
+    start = time.time()
+    out = opt.run(snapshot_path=snapshot_path(dim, fname, algo_name, run_id),
+                  snapshot_every=SNAPSHOT_EVERY, snapshot_config=config)
+    runtime_sec = time.time() - start
+
+    if isinstance(opt, GAReal):
+        best_fit, history = out
+    else:
+        _, best_fit, history = out
+
+    return {
+        "dim": dim,
+        "fname": fname,
+        "algo_name": algo_name,
+        "run_id": run_id,
+        "seed": seed,
+        "params": {**spec["algorithms"][algo_name], "max_evals": max_evals},
+        "best_fit": float(best_fit),
+        "runtime_sec": runtime_sec,
+        "profile": opt.profiler.as_dict(),
+        "evals": opt.history.n_evals,
+        "hit_evals": opt.history.hit_evals.tolist(),
+        "history": np.asarray(history, dtype=float),
+    }
+
+
+def save_cell_result(res, db):
+    dim, fname, algo_name, run_id = res["dim"], res["fname"], res["algo_name"], res["run_id"]
+
+    db.insert_run(dim, fname, algo_name, run_id, res["best_fit"],
+                  runtime_sec=res["runtime_sec"], seed=res["seed"], params=res["params"],
+                  evals=res["evals"], profile=res["profile"], hit_evals=res["hit_evals"],
+                  history=res["history"])
+
+    # the run is stored, its snapshot is no longer needed
+    snap = snapshot_path(dim, fname, algo_name, run_id)
+    if os.path.exists(snap):
+        os.remove(snap)
+
+    print(f"        -> D={dim} {fname} {algo_name} run {run_id}: "
+          f"{res['best_fit']:.4e}  ({res['runtime_sec']:.2f} sec)")
+
+
+def _pending_cells(selection, db):
+    """All selected cells that are not finished yet, grouped by (dim, fname)."""
+    runs = selection["runs"]
+    groups = {}
+
+    for dim in selection["dims"]:
+        for fname in selection["problems"]:
+            cells = []
+            for algo_name in selection["algos"]:
+                done = db.done_run_ids(dim, fname, algo_name)
+                print(f"    D={dim} {fname} {algo_name}: hotových běhů {len(done)}/{runs}")
+                for run_id in range(runs):
+                    if run_id not in done:
+                        cells.append((dim, fname, algo_name, run_id))
+            groups[(dim, fname)] = cells
+
+    return groups
+
+
+def _finish_group(dim, fname, manifest, spec, db):
+    """Regenerate chart and summary of one function, skipping outputs whose data did not change."""
+    params = {"algorithms": list(spec["algorithms"]), "evals_per_dim": spec["evals_per_dim"],
+              "data": db.fingerprint(dim, fname)}
 
-        for fname, pdata in PROBLEMS.items():
-            func = pdata["fn"]
-            bounds = pdata["bounds"]
-            print(f"\n  Funkce: {fname}")
+    if EXPORT_HISTORY_CSV:
+        for algo_name in spec["algorithms"]:
+            db.export_history_csv(dim, fname, algo_name)
 
-            for algo_name, factory in algorithms.items():
-                print(f"    Algoritmus: {algo_name}")
+    chart_path = f"charts/D{dim}_{fname}_convergence.png"
+    chart_params = {**params, "bands": CHART_BANDS}
+    if manifest.is_fresh(chart_path, [], chart_params):
+        print(f"  Graf {chart_path} je aktuální, přeskakuji.")
+    else:
+        print(f"\n  Generuji graf konvergence pro {fname} (D={dim})...")
+        generate_convergence_chart_single(dim, fname, db, spec)
+        manifest.record(chart_path, [], chart_params)
 
-                csv_path = f"results/raw/D{dim}_{fname}_{algo_name}.csv"
-                existing = load_existing_runs(csv_path)
-                done = len(existing)
+    table_path = f"tables/D{dim}_{fname}_summary.md"
+    if manifest.is_fresh(table_path, [], params):
+        print(f"  Tabulka {table_path} je aktuální, přeskakuji.")
+    else:
+        print(f"  Generuji summary tabulku pro {fname} (D={dim})...")
+        save_summary_single(dim, fname, db, spec)
+        manifest.record(table_path, [], params)
 
-                print(f"      Hotových běhů: {done}/{runs}")
 
-                if done < runs:
-                    for run_id in range(done, runs):
-                        seed = int(rng.integers(0, 10_000_000))
-                        opt = factory(func, dim, bounds, max_evals, seed)
+# ---------------------------------------------------------
+# Main Experiment Loop
+# ---------------------------------------------------------
 
-                        start = time.time()
-                        out = opt.run()
-                        runtime_sec = time.time() - start
+def _run_selection(selection, workers, spec, manifest, db):
+    print(f"\n===== Kontrola hotových běhů (D = {selection['dims']}) =====")
+    groups = _pending_cells(selection, db)
+    remaining = {key: len(cells) for key, cells in groups.items()}
+    total = sum(remaining.values())
+    print(f"\n===== Zbývá {total} běhů – workers = {workers} =====")
+
+    # groups that are already complete only need their outputs
+    for key, count in remaining.items():
+        if count == 0:
+            _finish_group(*key, manifest, spec, db)
+
+    if total == 0:
+        return
+
+    if workers == 1:
+        for key, cells in groups.items():
+            for cell in cells:
+                save_cell_result(run_cell(*cell, spec), db)
+            if cells:
+                _finish_group(*key, manifest, spec, db)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_cell, *cell, spec)
+                       for cells in groups.values() for cell in cells]
 
-                        if isinstance(opt, GAReal):
-                            best_fit, history = out
-                        else:
-                            _, best_fit, history = out
+            for fut in as_completed(futures):
+                res = fut.result()
+                save_cell_result(res, db)
 
-                        append_csv(csv_path, run_id, best_fit, runtime_sec)
+                key = (res["dim"], res["fname"])
+                remaining[key] -= 1
+                if remaining[key] == 0:
+                    _finish_group(*key, manifest, spec, db)
 
-                        hist_path = f"results/raw/D{dim}_{fname}_{algo_name}_run{run_id}_history.csv"
-                        with open(hist_path, "w", newline="", encoding="utf-8") as hf:
-                            writer = csv.writer(hf)
-                            writer.writerow(["eval", "best_so_far"])
-                            for e, b in history:
-                                writer.writerow([e, b])
 
-                        print(f"        -> run {run_id}: {best_fit:.4e}  ({runtime_sec:.2f} sec)")
+def run_experiments(runs=None, workers=None, spec=None, dims=None, problems=None, algos=None):
+    """Run the selected part of the comparison grid.
 
-            print(f"\n  Generuji graf konvergence pro {fname} (D={dim})...")
-            generate_convergence_chart_single(dim, fname)
+    Args:
+        runs: Number of runs per (dim, problem, algorithm); None = value from the spec.
+        workers: Number of worker processes. None uses all cores, 1 runs serially
+            in the current process. Results do not depend on this value.
+        spec: Experiment spec dict (see experiment.json); None loads the default file.
+        dims, problems, algos: Optional filters, each value must exist in the spec.
+    """
+    spec = spec or load_spec(DEFAULT_SPEC_PATH, PROBLEMS)
+    selection = select(spec, dims, problems, algos, runs)
 
-            print(f"  Generuji summary tabulku pro {fname} (D={dim})...")
-            save_summary_single(dim, fname)
+    ensure_dirs()
+    manifest = Manifest()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with ResultsDB() as db:
+        _run_selection(selection, workers, spec, manifest, db)
 
     print("\n=== Všechny výpočty dokončeny ===")
 
 
+# ---------------------------------------------------------
+# Work-queue mode (several processes / nodes on a shared filesystem)
+# ---------------------------------------------------------
+#   main.py --queue enqueue   put the selected unfinished cells into the queue
+#   main.py --queue work      run cells from the queue (on every node, --workers processes)
+#   main.py --queue collect   move finished results into results.db, build charts/tables
+# The spec is stored in the queue at enqueue time, so every worker uses the same one.
+
+def enqueue_experiments(spec, selection, queue_path=QUEUE_PATH):
+    ensure_dirs()
+    with ResultsDB() as db, WorkQueue(queue_path) as queue:
+        stored = queue.get_meta("spec")
+        if stored is not None and json.loads(stored) != spec:
+            raise SpecError(f"Fronta {queue_path} už obsahuje jinou specifikaci.")
+        queue.set_meta("spec", json.dumps(spec))
+
+        groups = _pending_cells(selection, db)
+        added = queue.enqueue(cell for cells in groups.values() for cell in cells)
+        print(f"\n===== Do fronty přidáno {added} běhů ({queue.counts()}) =====")
+
+
+def queue_worker(queue_path=QUEUE_PATH):
+    """One worker process; top-level so that it can be started in a process pool."""
+    with WorkQueue(queue_path) as queue:
+        stored = queue.get_meta("spec")
+    if stored is None:
+        raise SpecError(f"Fronta {queue_path} je prázdná (nejdřív --queue enqueue).")
+    spec = json.loads(stored)
+    return work(queue_path, lambda cell: run_cell(*cell, spec))
+
+
+def run_queue_workers(workers, queue_path=QUEUE_PATH):
+    if workers == 1:
+        completed = queue_worker(queue_path)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            completed = sum(pool.map(queue_worker, [queue_path] * workers))
+    print(f"\n=== Fronta vyčerpána, dokončeno {completed} běhů ===")
+
+
+def collect_results(queue_path=QUEUE_PATH):
+    """Store finished queue results in results.db and build outputs of complete groups."""
+    ensure_dirs()
+    manifest = Manifest()
+    touched = set()
+
+    with ResultsDB() as db, WorkQueue(queue_path) as queue:
+        stored = queue.get_meta("spec")
+        if stored is None:
+            print(f"Fronta {queue_path} je prázdná.")
+            return
+        spec = json.loads(stored)
+
+        while True:
+            batch = queue.take_done()
+            if not batch:
+                break
+            for _, res in batch:
+                try:
+                    save_cell_result(res, db)
+                except sqlite3.IntegrityError:
+                    pass  # stored by an earlier, interrupted collection
+                touched.add((res["dim"], res["fname"]))
+            queue.mark_collected([cell_id for cell_id, _ in batch])
+
+        unfinished = queue.unfinished_groups()
+        for key in sorted(touched - unfinished):
+            _finish_group(*key, manifest, spec, db)
+
+        print(f"\n=== Stav fronty: {queue.counts()} ===")
+
+
 # ---------------------------------------------------------
 # MAIN ENTRY
 # ---------------------------------------------------------
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Porovnání GA/DE/PSO – spustí (část) mřížky experimentů ze specifikace.")
+    parser.add_argument("--spec", default=DEFAULT_SPEC_PATH, help="JSON specifikace experimentu")
+    parser.add_argument("--dims", type=int, nargs="+", help="jen tyto dimenze")
+    parser.add_argument("--problems", nargs="+", help="jen tyto funkce")
+    parser.add_argument("--algos", nargs="+", help="jen tyto algoritmy")
+    parser.add_argument("--runs", type=int, help="počet běhů (výchozí ze specifikace)")
+    parser.add_argument("--workers", type=int, help="počet procesů (výchozí = počet jader)")
+    parser.add_argument("--queue", choices=["enqueue", "work", "collect"],
+                        help="režim sdílené fronty (více procesů / uzlů nad jedním souborem)")
+    parser.add_argument("--queue-db", default=QUEUE_PATH, help="soubor fronty")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        spec = load_spec(args.spec, PROBLEMS)
+        select(spec, args.dims, args.problems, args.algos, args.runs)
+        if args.workers is not None and args.workers < 1:
+            raise SpecError("--workers musí být >= 1")
+    except (SpecError, OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.queue == "enqueue":
+        selection = select(spec, args.dims, args.problems, args.algos, args.runs)
+        try:
+            enqueue_experiments(spec, selection, args.queue_db)
+        except SpecError as e:
+            print(e, file=sys.stderr)
+            return 2
+    elif args.queue == "work":
+        run_queue_workers(args.workers or os.cpu_count() or 1, args.queue_db)
+    elif args.queue == "collect":
+        collect_results(args.queue_db)
+    else:
+        run_experiments(runs=args.runs, workers=args.workers, spec=spec,
+                        dims=args.dims, problems=args.problems, algos=args.algos)
+    return 0
+
+
 if __name__ == "__main__":
-    run_experiments(runs=11)
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import os
+import json
+import hashlib
+
+MANIFEST_PATH = "results/manifest.json"
+
+_CHUNK = 1 << 20
+
+
+class Manifest:
+    """Dependency manifest of generated outputs (tables, charts, README).
+
+    For every output it stores the content hashes of the input files it was built
+    from (plus optional parameters). An output is fresh when it exists and its
+    inputs still hash to the recorded values, so it can be skipped.
+
+    Hashes are cached by (size, mtime) so unchanged large files are not re-read.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.outputs = {}
+        self._hash_cache = {}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.outputs = data.get("outputs", {})
+            self._hash_cache = data.get("hashes", {})
+
+    def file_hash(self, path):
+        if not os.path.exists(path):
+            return None
+
+        st = os.stat(path)
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+
+        self._hash_cache[path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def signature(self, inputs, params=None):
+        return {
+            "inputs": {p: self.file_hash(p) for p in sorted(inputs)},
+            "params": params,
+        }
+
+    def is_fresh(self, output, inputs, params=None):
+        if not os.path.exists(output):
+            return False
+        return self.outputs.get(output) == self.signature(inputs, params)
+
+    def record(self, output, inputs, params=None):
+        self.outputs[output] = self.signature(inputs, params)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"outputs": self.outputs, "hashes": self._hash_cache}, f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,66 @@
+import time
+from contextlib import nullcontext
+
+PHASES = ("init", "variation", "evaluation", "selection", "bookkeeping")
+
+
+class _Phase:
+    __slots__ = ("prof", "name", "wall", "cpu")
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def __exit__(self, *exc):
+        self.prof.wall[self.name] += time.perf_counter() - self.wall
+        self.prof.cpu[self.name] += time.process_time() - self.cpu
+        return False
+
+
+class PhaseProfiler:
+    """Accumulates wall (perf_counter) and CPU (process_time) seconds per phase.
+
+    Usage inside an optimizer:
+
+        with self.profiler.phase("variation"):
+            ...
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.wall = dict.fromkeys(PHASES, 0.0)
+        self.cpu = dict.fromkeys(PHASES, 0.0)
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def as_dict(self):
+        """Flat dict {"wall_<phase>": s, ..., "cpu_<phase>": s, ...}."""
+        out = {f"wall_{p}": self.wall[p] for p in PHASES}
+        out.update({f"cpu_{p}": self.cpu[p] for p in PHASES})
+        return out
+
+
+class _NullProfiler:
+    """Disabled profiler: `phase` returns one shared no-op context manager."""
+
+    enabled = False
+    _null = nullcontext()
+
+    def phase(self, name):
+        return self._null
+
+    def as_dict(self):
+        return {}
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def make_profiler(enabled):
+    return PhaseProfiler() if enabled else NULL_PROFILER
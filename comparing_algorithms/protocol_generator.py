@@ -1,7 +1,9 @@
 import os
-import glob
 from collections import defaultdict
 
+from manifest import Manifest
+from results_db import ResultsDB
+
 OUTPUT_FILE = "README.md"
 
 
@@ -23,83 +25,37 @@ def embed_image(path):
 
 
 # ---------------------------------------------------------
-# Detect functions automatically
-# ---------------------------------------------------------
-
-def detect_functions(tables_dir):
-    files = glob.glob(os.path.join(tables_dir, "D10_*_summary.md"))
-
-    fnames = []
-    for f in files:
-        base = os.path.basename(f)
-        parts = base.split("_")
-        if len(parts) >= 3:
-            fnames.append(parts[1])
-
-    return sorted(fnames)
-
-
-# ---------------------------------------------------------
-# Parse summary table to find the best algorithm
+# Main protocol generator
 # ---------------------------------------------------------
 
-def extract_best_algorithm_from_table(path):
-    """
-    Reads a markdown summary table and finds the algorithm with the best (lowest) mean.
-    Returns algorithm name or None if table missing.
-    """
-    if not os.path.exists(path):
-        return None
-
-    best_algo = None
-    best_value = float("inf")
-
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    for line in lines:
-
-        # skip non-data rows
-        if not line.startswith("|"):
-            continue
-        if "Algorithm" in line:
-            continue
-        if "---" in line:  # separator row
-            continue
-
-        # split row
-        parts = [p.strip() for p in line.split("|")[1:-1]]
-
-        # ensure correct column count
-        if len(parts) < 2:
-            continue
-
-        algo = parts[0].replace("**", "").strip()
-        mean_str = parts[1].replace("**", "").strip()
-
-        # skip invalid numeric rows
-        try:
-            mean = float(mean_str)
-        except ValueError:
-            continue
-
-        if mean < best_value:
-            best_value = mean
-            best_algo = algo
+def protocol_inputs(functions, dims, tables_dir="tables", charts_dir="charts"):
+    """Files the README is built from (including this generator itself)."""
+    inputs = [os.path.relpath(__file__)]
+    for fname in functions:
+        for D in dims:
+            inputs.append(f"{tables_dir}/D{D}_{fname}_summary.md")
+            inputs.append(f"{charts_dir}/D{D}_{fname}_convergence.png")
+    return inputs
 
-    return best_algo
 
+def generate_protocol(force=False):
+    with ResultsDB() as db:
+        _generate_protocol(db, force)
 
-# ---------------------------------------------------------
-# Main protocol generator
-# ---------------------------------------------------------
 
-def generate_protocol():
+def _generate_protocol(db, force):
     tables_dir = "tables"
     charts_dir = "charts"
     dims = [10, 20]
 
-    functions = detect_functions(tables_dir)
+    functions = db.functions(dim=dims[0])
+
+    manifest = Manifest()
+    inputs = protocol_inputs(functions, dims, tables_dir, charts_dir)
+    params = {"functions": functions, "dims": dims, "data": db.fingerprint()}
+    if not force and manifest.is_fresh(OUTPUT_FILE, inputs, params):
+        print(f"\n{OUTPUT_FILE} je aktuální, přeskakuji.")
+        return
 
     # structure for storing winners
     best_summary = defaultdict(dict)
@@ -121,7 +77,7 @@ Vybrané algoritmy pro porovnání:
 - **DE** – rand/1/bin, best/1/bin, jDE  
 - **PSO** – linear inertia, const-global, const-ring  
 
-Testované funkce jsou automaticky detekované podle vygenerovaných tabulek (včetně *sphere*, která sloužila jako rychlý benchmark).
+Testované funkce jsou automaticky detekované podle uložených výsledků (včetně *sphere*, která sloužila jako rychlý benchmark).
 
 Každý algoritmus optimalizuje každou funkci **11×**.
 
@@ -160,9 +116,8 @@ Následně vytváříme grafy konvergence.
                 lines.append(f"\n## Výsledky – D={D}\n")
                 lines.append(load_table(table_path))
 
-                # uložit nejlepší metodu
-                best = extract_best_algorithm_from_table(table_path)
-                best_summary[fname][D] = best
+                # uložit nejlepší metodu (nejnižší průměr z databáze)
+                best_summary[fname][D] = db.best_algorithm(D, fname)
             else:
                 lines.append(f"\n⚠️ Chybí tabulka: {table_path}\n")
 
@@ -227,6 +182,8 @@ Celkově se jako nejuniverzálnější metoda ukázala varianta **jDE**, která
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
+    manifest.record(OUTPUT_FILE, inputs, params)
+
     print(f"\nREADME.md bylo úspěšně vygenerováno → {OUTPUT_FILE}")
 
 
@@ -1,13 +1,28 @@
 import numpy as np
 
-class PSO:
+from recorder import HistoryRecorder
+from snapshot import Snapshotter
+from profiling import make_profiler
+from evaluators import make_evaluator
+from ask_tell import AskTellMixin
+
+class PSO(AskTellMixin):
     """Particle Swarm Optimization without boundary clipping.
-    Evaluations outside bounds return +inf. History recorded by FES.
+    Evaluations outside bounds return +inf. History recorded by FES
+    according to the `record` policy (see HistoryRecorder), optionally
+    stopping at a target error when the optimum `f_opt` is known.
+    Driven by `run()` or through `ask()` / `tell()`; `ask` only hands out
+    particles inside the bounds, the others count as FES with +inf.
     """
 
+    _counter = "fes"
+    _budget = "max_fes"
+
     def __init__(self, func, dim, lower, upper, npop=40, max_fes=20000,
                  w_strategy="linear", w_max=0.8, w_min=0.3, w_const=0.7,
-                 c1=2.0, c2=2.0, topology="global", seed=None):
+                 c1=2.0, c2=2.0, topology="global", vectorized=False, evaluator=None,
+                 record="improvement", checkpoints=None, profile=False,
+                 f_opt=None, target_eps=None, seed=None):
 
         self.func = func
         self.dim = dim
@@ -29,9 +44,19 @@ class PSO:
         self.c1 = c1
         self.c2 = c2
         self.topology = topology
+        self.vectorized = vectorized  # func takes (N, dim) and returns N values
+        # swarm evaluation backend: "serial" / "thread" / "process" / instance (evaluators.py)
+        self.evaluator = make_evaluator(evaluator, func, vectorized)
+        self._owns_evaluator = isinstance(evaluator, str)
 
         self.rng = np.random.default_rng(seed)
         self.fes = 0
+        self.X = None
+        self.pbest_vals = None
+        self._V_next = None
+        self.history = HistoryRecorder(max_fes, record, checkpoints,
+                                       f_opt=f_opt, stop_eps=target_eps)
+        self.profiler = make_profiler(profile)
 
     def _current_w(self):
         if self.w_strategy == "linear":
@@ -39,18 +64,6 @@ class PSO:
             return self.w_max - (self.w_max - self.w_min) * r
         return self.w_const
 
-    def _evaluate(self, x):
-        """Evaluate only if inside bounds, otherwise return +inf."""
-        if self.fes >= self.max_fes:
-            return np.inf
-
-        self.fes += 1
-
-        if np.any(x < self.lower) or np.any(x > self.upper):
-            return np.inf
-
-        return self.func(x)
-
     def _apply_vmax(self, v):
         return np.clip(v, -self.vmax, self.vmax)
 
@@ -59,54 +72,111 @@ class PSO:
         right = (i + 1) % self.npop
         return min([left, i, right], key=lambda j: pbest_vals[j])
 
-    def run(self):
-        X = self.rng.uniform(self.lower, self.upper, (self.npop, self.dim))
-        V = self.rng.uniform(-self.vmax, self.vmax, (self.npop, self.dim))
-
-        pbest = X.copy()
-        pbest_vals = np.array([self._evaluate(x) for x in X])
-
-        g_idx = int(np.argmin(pbest_vals))
-        gbest = pbest[g_idx].copy()
-        gbest_val = pbest_vals[g_idx]
+    def _propose(self):
+        """Initial swarm first, then the moved swarm of the next iteration."""
+        if self.X is None:
+            with self.profiler.phase("init"):
+                self.X = self.rng.uniform(self.lower, self.upper, (self.npop, self.dim))
+                self.V = self.rng.uniform(-self.vmax, self.vmax, (self.npop, self.dim))
+                self.pbest = self.X.copy()
+            return self.X
 
-        history = [(self.fes, gbest_val)]
-
-        while self.fes < self.max_fes:
+        X, V, pbest, pbest_vals = self.X, self.V, self.pbest, self.pbest_vals
 
+        with self.profiler.phase("variation"):
             w = self._current_w()
 
             if self.topology == "ring":
                 nbest = np.array([pbest[self._ring_index(pbest_vals, i)]
                                   for i in range(self.npop)])
             else:
-                nbest = np.tile(gbest, (self.npop, 1))
+                nbest = np.tile(self.gbest, (self.npop, 1))
 
             r1 = self.rng.random((self.npop, self.dim))
             r2 = self.rng.random((self.npop, self.dim))
 
             V = w * V + self.c1 * r1 * (pbest - X) + self.c2 * r2 * (nbest - X)
-            V = self._apply_vmax(V)
-
-            X = X + V  # NO boundary clipping
-
-            for i in range(self.npop):
-                if self.fes >= self.max_fes:
-                    break
-
-                fval = self._evaluate(X[i])
-
-                if fval < pbest_vals[i]:
-                    pbest_vals[i] = fval
-                    pbest[i] = X[i].copy()
-
-                    if fval < gbest_val:
-                        gbest_val = fval
-                        gbest = X[i].copy()
-
-            history.append((self.fes, gbest_val))
-
-        return gbest, gbest_val, history
+            self._V_next = self._apply_vmax(V)
+
+            return X + self._V_next  # NO boundary clipping
+
+    def _eval_rows(self, X, n):
+        """Particles within the budget that lie inside the bounds (the rest get +inf)."""
+        return np.flatnonzero(np.all((X[:n] >= self.lower) & (X[:n] <= self.upper), axis=1))
+
+    def _complete(self, X, fvals, n):
+        if self.pbest_vals is None:
+            # initial swarm
+            self.pbest_vals = fvals
+            g_idx = int(np.argmin(self.pbest_vals))
+            self.gbest = self.pbest[g_idx].copy()
+            self.gbest_val = self.pbest_vals[g_idx]
+            return
+
+        pbest, pbest_vals = self.pbest, self.pbest_vals
+        with self.profiler.phase("selection"):
+            improved = fvals < pbest_vals
+            pbest_vals[improved] = fvals[improved]
+            pbest[improved] = X[improved]
+
+            i_best = int(np.argmin(fvals))
+            if fvals[i_best] < self.gbest_val:
+                self.gbest_val = fvals[i_best]
+                self.gbest = X[i_best].copy()
+
+        self.X, self.V = X, self._V_next
+
+    def get_state(self):
+        """Swarm, personal/global bests, RNG state, FES counter and history."""
+        return {
+            "X": self.X, "V": self.V,
+            "pbest": self.pbest, "pbest_vals": self.pbest_vals,
+            "gbest": self.gbest, "gbest_val": self.gbest_val,
+            "rng": self.rng.bit_generator.state,
+            "fes": self.fes,
+            "history": self.history,
+            "profiler": self.profiler,
+        }
+
+    def set_state(self, state):
+        self.X, self.V = state["X"], state["V"]
+        self.pbest, self.pbest_vals = state["pbest"], state["pbest_vals"]
+        self.gbest, self.gbest_val = state["gbest"], state["gbest_val"]
+        self.rng.bit_generator.state = state["rng"]
+        self.fes = state["fes"]
+        self.history = state["history"]
+        self.profiler = state["profiler"]
+
+    def run(self, snapshot_path=None, snapshot_every=None, snapshot_config=None):
+        """Run until max_fes (or until best - f_opt < target_eps). With `snapshot_path` the state is saved atomically
+        every `snapshot_every` FES and an existing snapshot is resumed from, unless it was saved under
+        a different `snapshot_config` (seed, parameters, budget)."""
+        snap = Snapshotter(snapshot_path, snapshot_every, snapshot_config)
+        state = snap.restore()
+        if state is not None:
+            self.set_state(state)
+        snap.start(self.fes)
+
+        while not self.done:
+            self._step()
+            with self.profiler.phase("bookkeeping"):
+                snap.maybe_save(self.fes, self.get_state)
+
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.gbest, self.gbest_val, self.history.as_array()
+
+    async def arun(self, objective):
+        """Async variant of `run` on an async objective (`await objective.evaluate_many(X)`, e.g. a
+        `sim_objective.SimulatorObjective`, which bounds the requests in flight). No snapshots."""
+        while not self.done:
+            await self._astep(objective)
+
+        self.history.finish()
+        if self._owns_evaluator:
+            self.evaluator.close()
+        return self.gbest, self.gbest_val, self.history.as_array()
 
 
 # ------------------------
@@ -0,0 +1,145 @@
+import numpy as np
+
+# FES fractions at which CEC benchmarks report the error (CEC 2017 style).
+CEC_FRACTIONS = (0.01, 0.02, 0.03, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+RECORD_MODES = ("improvement", "checkpoints")
+
+# Precision levels (best - f*) for which the FES needed to reach them are recorded.
+PRECISIONS = (1e-1, 1e-2, 1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8)
+
+
+def checkpoint_grid(max_evals, fractions=CEC_FRACTIONS):
+    """Sorted unique evaluation counts for the given fractions of the budget."""
+    fes = np.rint(np.asarray(fractions, dtype=float) * max_evals).astype(np.int64)
+    return np.unique(np.clip(fes, 1, max_evals))
+
+
+class HistoryRecorder:
+    """Best-so-far history shared by all optimizers.
+
+    The optimizer passes the objective values of consecutive evaluations to
+    `record` (a whole batch at a time); the recorder keeps the best-so-far value
+    after every single evaluation implicitly and stores only:
+
+    - "improvement": the (eval, best) pairs where best-so-far strictly improved,
+      i.e. a lossless step function of the convergence curve,
+    - "checkpoints": best-so-far at the fixed FES grid `checkpoints`
+      (CEC fractions of `max_evals` by default), identical for every algorithm.
+
+    With a known optimum `f_opt` it also records, for every level in
+    `precisions`, the first evaluation at which `best - f_opt < level`
+    (`hit_evals`, NaN if never reached), and `target_reached` tells the
+    optimizer to stop once `best - f_opt < stop_eps` (CEC-style target stop).
+
+    Args:
+        max_evals: Evaluation budget of the run.
+        mode: One of RECORD_MODES.
+        checkpoints: Evaluation counts for "checkpoints" mode or None.
+        f_opt: Known optimal value or None.
+        precisions: Precision levels recorded in `hit_evals`.
+        stop_eps: Target error for early termination or None (run the whole budget).
+    """
+
+    def __init__(self, max_evals, mode="improvement", checkpoints=None,
+                 f_opt=None, precisions=PRECISIONS, stop_eps=None):
+        if mode not in RECORD_MODES:
+            raise ValueError(f"Unknown record mode: {mode!r}")
+
+        self.max_evals = max_evals
+        self.mode = mode
+        if checkpoints is None:
+            checkpoints = checkpoint_grid(max_evals)
+        self.checkpoints = np.unique(np.asarray(checkpoints, dtype=np.int64))
+
+        self.best = np.inf
+        self.n_evals = 0
+        self._next_cp = 0
+        self._evals = []
+        self._values = []
+
+        self.f_opt = f_opt
+        self.precisions = np.asarray(precisions if f_opt is not None else (), dtype=float)
+        self.hit_evals = np.full(len(self.precisions), np.nan)
+        self.stop_eps = stop_eps if f_opt is not None else None
+        self.target_reached = False
+
+    def record(self, values):
+        """Ingest objective values of the next `len(values)` evaluations."""
+        values = np.asarray(values, dtype=float).ravel()
+        n = values.size
+        if n == 0:
+            return
+
+        start = self.n_evals
+        curve = np.minimum.accumulate(np.concatenate(([self.best], values)))
+
+        if self.mode == "improvement":
+            pos = np.flatnonzero(curve[1:] < curve[:-1])
+            if pos.size > 0:
+                self._evals.append(start + 1 + pos)
+                self._values.append(curve[1:][pos])
+        else:
+            stop = np.searchsorted(self.checkpoints, start + n, side="right")
+            if stop > self._next_cp:
+                cps = self.checkpoints[self._next_cp:stop]
+                self._evals.append(cps)
+                self._values.append(curve[cps - start])
+                self._next_cp = stop
+
+        if self.f_opt is not None:
+            self._record_targets(start, curve)
+
+        self.best = float(curve[-1])
+        self.n_evals = start + n
+
+    def _record_targets(self, start, curve):
+        error = curve[1:] - self.f_opt
+        for k in np.flatnonzero(np.isnan(self.hit_evals)):
+            pos = np.flatnonzero(error < self.precisions[k])
+            if pos.size > 0:
+                self.hit_evals[k] = start + 1 + pos[0]
+
+        if self.stop_eps is not None and error[-1] < self.stop_eps:
+            self.target_reached = True
+
+    def finish(self):
+        """Close the history at the end of a run.
+
+        "improvement" adds the final (eval, best) point so the step function spans
+        the whole run; "checkpoints" fills checkpoints that were not reached
+        (e.g. after early termination) with the final best-so-far value.
+        """
+        if self.n_evals == 0:
+            return
+
+        if self.mode == "improvement":
+            if not self._evals or self._evals[-1][-1] < self.n_evals:
+                self._evals.append(np.array([self.n_evals]))
+                self._values.append(np.array([self.best]))
+        elif self._next_cp < len(self.checkpoints):
+            cps = self.checkpoints[self._next_cp:]
+            self._evals.append(cps)
+            self._values.append(np.full(len(cps), self.best))
+            self._next_cp = len(self.checkpoints)
+
+    def as_array(self):
+        """History as an (n, 2) float array of (eval, best_so_far)."""
+        if not self._evals:
+            return np.empty((0, 2))
+        return np.column_stack([np.concatenate(self._evals).astype(float),
+                                np.concatenate(self._values)])
+
+
+def best_at(history, fes):
+    """Best-so-far of a recorded history at the evaluation counts `fes`.
+
+    Works for both policies since both describe a right-continuous step function;
+    points before the first record are NaN.
+    """
+    history = np.asarray(history, dtype=float).reshape(-1, 2)
+    idx = np.searchsorted(history[:, 0], fes, side="right") - 1
+    out = np.full(np.shape(fes), np.nan)
+    ok = idx >= 0
+    out[ok] = history[idx[ok], 1]
+    return out
@@ -0,0 +1,352 @@
+import os
+import re
+import csv
+import json
+import glob
+import time
+import hashlib
+import sqlite3
+import argparse
+
+import numpy as np
+
+from profiling import PHASES
+from recorder import PRECISIONS
+
+DB_PATH = "results/results.db"
+RAW_DIR = "results/raw"
+
+# One row per finished run; phase times, target hits and the convergence history
+# hang off it. Histories are stored as raw little-endian float64 (eval, best) pairs;
+# seeds are unsigned 64-bit (outside SQLite INTEGER), so they are kept as text.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    dim         INTEGER NOT NULL,
+    fname       TEXT    NOT NULL,
+    algo        TEXT    NOT NULL,
+    run_id      INTEGER NOT NULL,
+    seed        TEXT,
+    params      TEXT,
+    best        REAL    NOT NULL,
+    runtime_sec REAL,
+    evals       INTEGER,
+    created     REAL    NOT NULL,
+    UNIQUE (dim, fname, algo, run_id)
+);
+CREATE INDEX IF NOT EXISTS runs_cell ON runs (dim, fname, algo);
+
+CREATE TABLE IF NOT EXISTS phase_times (
+    run  INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    phase TEXT   NOT NULL,
+    wall REAL    NOT NULL,
+    cpu  REAL    NOT NULL,
+    PRIMARY KEY (run, phase)
+);
+
+CREATE TABLE IF NOT EXISTS targets (
+    run       INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    precision REAL    NOT NULL,
+    fes       INTEGER,
+    PRIMARY KEY (run, precision)
+);
+
+CREATE TABLE IF NOT EXISTS histories (
+    run  INTEGER PRIMARY KEY REFERENCES runs (id) ON DELETE CASCADE,
+    rows INTEGER NOT NULL,
+    data BLOB    NOT NULL
+);
+"""
+
+HISTORY_DTYPE = np.dtype("<f8")
+
+
+class ResultsDB:
+    """SQLite store of all experiment results (runs, seeds, parameters, timings, histories).
+
+    The database runs in WAL mode, so readers (charts, README) never block the
+    writer and several processes may write with a busy timeout. Every run is
+    inserted in one transaction: after a crash it is either complete or absent.
+    """
+
+    def __init__(self, path=DB_PATH, timeout=60.0):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # autocommit mode; transactions are opened explicitly in `transaction`
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def transaction(self):
+        return Transaction(self.conn)
+
+    # -----------------------------------------------------
+    # Writing
+    # -----------------------------------------------------
+
+    def insert_run(self, dim, fname, algo_name, run_id, best, runtime_sec=None, seed=None,
+                   params=None, evals=None, profile=None, hit_evals=None, history=None):
+        """Store one finished run with everything measured about it (atomically).
+
+        Raises sqlite3.IntegrityError when the run is already stored.
+        """
+        with self.transaction():
+            cur = self.conn.execute(
+                "INSERT INTO runs (dim, fname, algo, run_id, seed, params, best, runtime_sec, evals, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (dim, fname, algo_name, run_id, None if seed is None else str(seed),
+                 None if params is None else json.dumps(params, sort_keys=True),
+                 float(best), runtime_sec, evals, time.time()))
+            pk = cur.lastrowid
+
+            if profile:
+                self.conn.executemany(
+                    "INSERT INTO phase_times (run, phase, wall, cpu) VALUES (?, ?, ?, ?)",
+                    [(pk, p, profile[f"wall_{p}"], profile[f"cpu_{p}"]) for p in PHASES])
+
+            if hit_evals is not None:
+                self.conn.executemany(
+                    "INSERT INTO targets (run, precision, fes) VALUES (?, ?, ?)",
+                    [(pk, p, None if np.isnan(h) else int(h)) for p, h in zip(PRECISIONS, hit_evals)])
+
+            if history is not None:
+                rows = np.ascontiguousarray(np.asarray(history, dtype=HISTORY_DTYPE).reshape(-1, 2))
+                self.conn.execute("INSERT INTO histories (run, rows, data) VALUES (?, ?, ?)",
+                                  (pk, len(rows), rows.tobytes()))
+        return pk
+
+    # -----------------------------------------------------
+    # Queries
+    # -----------------------------------------------------
+
+    def done_run_ids(self, dim, fname, algo_name):
+        rows = self.conn.execute("SELECT run_id FROM runs WHERE dim = ? AND fname = ? AND algo = ?",
+                                 (dim, fname, algo_name))
+        return {r[0] for r in rows}
+
+    def functions(self, dim=None):
+        sql, args = "SELECT DISTINCT fname FROM runs", ()
+        if dim is not None:
+            sql, args = sql + " WHERE dim = ?", (dim,)
+        return sorted(r[0] for r in self.conn.execute(sql, args))
+
+    def best_and_times(self, dim, fname, algo_name):
+        """Arrays (best values, runtimes) of all runs of one cell, ordered by run id."""
+        rows = self.conn.execute(
+            "SELECT best, runtime_sec FROM runs WHERE dim = ? AND fname = ? AND algo = ? ORDER BY run_id",
+            (dim, fname, algo_name)).fetchall()
+        if not rows:
+            return np.empty(0), np.empty(0)
+        best, times = np.array(rows, dtype=float).T
+        return best, times
+
+    def iter_histories(self, dim, fname, algo_name):
+        """Yield (run_id, (n, 2) array of (eval, best_so_far)) one run at a time."""
+        rows = self.conn.execute(
+            "SELECT r.run_id, h.data FROM runs r JOIN histories h ON h.run = r.id"
+            " WHERE r.dim = ? AND r.fname = ? AND r.algo = ? ORDER BY r.run_id",
+            (dim, fname, algo_name))
+        for run_id, data in rows:
+            yield run_id, np.frombuffer(data, dtype=HISTORY_DTYPE).reshape(-1, 2)
+
+    def histories(self, dim, fname, algo_name):
+        """{run_id: (n, 2) array of (eval, best_so_far)}."""
+        return dict(self.iter_histories(dim, fname, algo_name))
+
+    def mean_profile(self, dim, fname, algo_name):
+        """Mean wall/CPU seconds per phase ({"wall_<phase>": s, "cpu_<phase>": s}), or None."""
+        rows = self.conn.execute(
+            "SELECT t.phase, AVG(t.wall), AVG(t.cpu) FROM phase_times t JOIN runs r ON t.run = r.id"
+            " WHERE r.dim = ? AND r.fname = ? AND r.algo = ? GROUP BY t.phase",
+            (dim, fname, algo_name)).fetchall()
+        if not rows:
+            return None
+        out = {f"wall_{phase}": wall for phase, wall, _ in rows}
+        out.update({f"cpu_{phase}": cpu for phase, _, cpu in rows})
+        return out
+
+    def ert(self, dim, fname, algo_name):
+        """Success rate and expected running time per precision level.
+
+        ERT = (FES of successful runs until the hit + all FES of unsuccessful runs)
+              / number of successful runs
+        Returns {precision: (success_rate, ert)} or None if no target data exists.
+        """
+        rows = self.conn.execute(
+            "SELECT t.precision, COUNT(*), COUNT(t.fes),"
+            "       SUM(COALESCE(t.fes, r.evals))"
+            " FROM targets t JOIN runs r ON t.run = r.id"
+            " WHERE r.dim = ? AND r.fname = ? AND r.algo = ? GROUP BY t.precision",
+            (dim, fname, algo_name)).fetchall()
+        if not rows:
+            return None
+        by_precision = {prec: (n, n_ok, spent) for prec, n, n_ok, spent in rows}
+        out = {}
+        for p in PRECISIONS:
+            n, n_ok, spent = by_precision[p]
+            out[p] = (n_ok / n, spent / n_ok if n_ok else np.inf)
+        return out
+
+    def best_algorithm(self, dim, fname):
+        """Algorithm with the lowest mean best value, or None if nothing is stored."""
+        row = self.conn.execute(
+            "SELECT algo FROM runs WHERE dim = ? AND fname = ? GROUP BY algo ORDER BY AVG(best) LIMIT 1",
+            (dim, fname)).fetchone()
+        return row[0] if row else None
+
+    def fingerprint(self, dim=None, fname=None):
+        """Content hash of the stored runs (their results and insert times).
+
+        Changes when a run is added, removed or rewritten in place (e.g. re-imported
+        with the same id), since every insert stamps a new `created`.
+        """
+        sql, args = "SELECT id, algo, run_id, best, evals, runtime_sec, created FROM runs", []
+        if dim is not None:
+            sql, args = sql + " WHERE dim = ? AND fname = ?", [dim, fname]
+        digest = hashlib.sha1()
+        for row in self.conn.execute(sql + " ORDER BY id", args):
+            digest.update(repr(row).encode())
+        return digest.hexdigest()
+
+    def export_history_csv(self, dim, fname, algo_name, out_dir=RAW_DIR):
+        """Optional export of the stored histories to the old one-CSV-per-run format."""
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for run_id, hist in self.histories(dim, fname, algo_name).items():
+            path = os.path.join(out_dir, f"D{dim}_{fname}_{algo_name}_run{run_id}_history.csv")
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["eval", "best_so_far"])
+                writer.writerows((int(e), b) for e, b in hist.tolist())
+            paths.append(path)
+        return paths
+
+
+class Transaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error). IMMEDIATE takes the write lock
+    up front, so two writers wait on the busy timeout instead of deadlocking."""
+
+    __slots__ = ("conn",)
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# ---------------------------------------------------------
+# One-time import of the old CSV / binary-store results
+# ---------------------------------------------------------
+
+_RESULT_CSV_RE = re.compile(r"^D(\d+)_([^_]+)_(.+)\.csv$")
+
+# Legacy binary history store, one per (dim, function, algorithm):
+#   D{dim}_{fname}_{algo}_history.bin      little-endian float64 rows (eval, best_so_far)
+#   D{dim}_{fname}_{algo}_history_idx.npy  int64 rows (run_id, start_row, stop_row)
+# The index was written after the data, so rows past the last indexed run are ignored.
+_HISTORY_DTYPE = np.dtype("<f8")
+
+
+def _load_histories(dim, fname, algo_name, raw_dir):
+    """{run_id: (n, 2) array} from the legacy binary store ({} when there is none)."""
+    base = os.path.join(raw_dir, f"D{dim}_{fname}_{algo_name}_history")
+    if not os.path.exists(base + "_idx.npy"):
+        return {}
+    index = np.load(base + "_idx.npy")
+    if len(index) == 0:
+        return {}
+
+    stop = int(index[:, 2].max())
+    if stop == 0:
+        return {int(run_id): np.empty((0, 2)) for run_id, _, _ in index}
+    data = np.memmap(base + ".bin", dtype=_HISTORY_DTYPE, mode="r", shape=(stop, 2))
+    return {int(run_id): data[start:end] for run_id, start, end in index}
+
+
+def _read_csv_history(path):
+    return np.loadtxt(path, delimiter=",", skiprows=1, dtype=_HISTORY_DTYPE, ndmin=2)
+
+
+def _read_rows(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return {int(r["run"]): r for r in csv.DictReader(f)}
+
+
+def import_raw_dir(db, raw_dir=RAW_DIR):
+    """Import results/raw/D{dim}_{fname}_{algo}.csv (+ profile, targets and histories).
+
+    Histories come from the binary history store if it exists, otherwise from the
+    per-run CSV files. Runs that are already in the database are skipped.
+    """
+    imported = 0
+    for path in sorted(glob.glob(os.path.join(raw_dir, "D*_*.csv"))):
+        name = os.path.basename(path)
+        if name.endswith(("_history.csv", "_profile.csv", "_targets.csv")):
+            continue
+        m = _RESULT_CSV_RE.match(name)
+        if not m:
+            continue
+        dim, fname, algo_name = int(m.group(1)), m.group(2), m.group(3)
+        base = path[:-len(".csv")]
+
+        done = db.done_run_ids(dim, fname, algo_name)
+        profiles = _read_rows(base + "_profile.csv")
+        targets = _read_rows(base + "_targets.csv")
+        stored = _load_histories(dim, fname, algo_name, raw_dir)
+
+        for run_id, row in sorted(_read_rows(path).items()):
+            if run_id in done:
+                continue
+
+            profile = profiles.get(run_id)
+            if profile:
+                profile = {k: float(v) for k, v in profile.items() if k != "run"}
+
+            hit_evals, evals = None, None
+            target = targets.get(run_id)
+            if target:
+                evals = int(target["evals"])
+                hit_evals = [float(target[f"fes_{p:.0e}"] or "nan") for p in PRECISIONS]
+
+            history = stored.get(run_id)
+            hist_csv = f"{base}_run{run_id}_history.csv"
+            if history is None and os.path.exists(hist_csv):
+                history = _read_csv_history(hist_csv)
+
+            db.insert_run(dim, fname, algo_name, run_id, float(row["best_value"]),
+                          runtime_sec=float(row["runtime_sec"]), evals=evals,
+                          profile=profile, hit_evals=hit_evals, history=history)
+            imported += 1
+
+        print(f"  D={dim} {fname} {algo_name}: hotovo")
+
+    print(f"Importováno {imported} běhů do databáze.")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import starých CSV výsledků do SQLite databáze.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+    with ResultsDB(args.db) as db:
+        import_raw_dir(db, args.raw_dir)
@@ -0,0 +1,166 @@
+import os
+import csv
+import time
+import argparse
+import tracemalloc
+
+import matplotlib.pyplot as plt
+
+from benchmark import continuous_optimizers, OBJECTIVES
+
+OUT_DIR = "scaling"
+RESULTS_CSV = f"{OUT_DIR}/scaling_results.csv"
+
+DIMS = [10, 30, 100, 300, 1000]
+POP_SIZES = [20, 50, 100, 200]
+EVALS = 50_000
+MEMORY_GENERATIONS = 5
+
+COLUMNS = ["algorithm", "dim", "pop", "objective", "evals",
+           "seconds", "evals_per_sec", "peak_mem_mb", "final_best"]
+
+
+# ---------------------------------------------------------
+# One cell of the study
+# ---------------------------------------------------------
+
+def measure(factory, func, dim, pop, evals):
+    """Throughput, peak memory and final quality of one (algorithm, D, N) cell.
+
+    Time is measured without tracemalloc (which slows allocations down); peak
+    memory comes from a separate short run of a few generations, which is
+    enough to reach the steady-state footprint of the optimizer.
+    """
+    opt = factory(func, dim, pop, evals)
+    start = time.perf_counter()
+    out = opt.run()
+    seconds = time.perf_counter() - start
+    final_best = out[-2] if len(out) == 3 else out[0]
+
+    mem_evals = min(evals, MEMORY_GENERATIONS * pop)
+    tracemalloc.start()
+    factory(func, dim, pop, mem_evals).run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "evals": evals,
+        "seconds": seconds,
+        "evals_per_sec": evals / seconds,
+        "peak_mem_mb": peak / 2 ** 20,
+        "final_best": float(final_best),
+    }
+
+
+def load_results(path=RESULTS_CSV):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for r in rows:
+        r["dim"], r["pop"], r["evals"] = int(r["dim"]), int(r["pop"]), int(r["evals"])
+        for key in ("seconds", "evals_per_sec", "peak_mem_mb", "final_best"):
+            r[key] = float(r[key])
+    return rows
+
+
+def append_result(row, path=RESULTS_CSV):
+    file_exists = os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        if not file_exists:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def run_study(dims, pop_sizes, algorithms, objective, evals):
+    os.makedirs(OUT_DIR, exist_ok=True)
+    factories = continuous_optimizers()
+    func = OBJECTIVES[objective]
+
+    done = {(r["algorithm"], r["dim"], r["pop"], r["objective"], r["evals"]) for r in load_results()}
+
+    for algo_name in algorithms:
+        for dim in dims:
+            for pop in pop_sizes:
+                key = (algo_name, dim, pop, objective, evals)
+                if key in done:
+                    continue
+                m = measure(factories[algo_name], func, dim, pop, evals)
+                append_result({"algorithm": algo_name, "dim": dim, "pop": pop,
+                               "objective": objective, **m})
+                print(f"  {algo_name:14s} D={dim:5d} N={pop:4d}: "
+                      f"{m['evals_per_sec']:10.0f} evals/s  {m['peak_mem_mb']:8.2f} MB  "
+                      f"best={m['final_best']:.3e}")
+
+
+# ---------------------------------------------------------
+# Charts + table
+# ---------------------------------------------------------
+
+def _plot(rows, x_key, group_key, group_val, y_key, ylabel, path):
+    sel = [r for r in rows if r[group_key] == group_val]
+    if not sel:
+        return
+
+    plt.figure(figsize=(10, 6))
+    for algo_name in sorted({r["algorithm"] for r in sel}):
+        pts = sorted((r[x_key], r[y_key]) for r in sel if r["algorithm"] == algo_name)
+        plt.plot([p[0] for p in pts], [p[1] for p in pts], marker="o", linewidth=2, label=algo_name)
+
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.xlabel("D" if x_key == "dim" else "velikost populace")
+    plt.ylabel(ylabel)
+    plt.title(f"{ylabel} – {group_key}={group_val}")
+    plt.grid(True, which="both", alpha=0.3)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+
+
+def generate_report(objective, evals):
+    rows = [r for r in load_results() if r["objective"] == objective and r["evals"] == evals]
+    if not rows:
+        print("Žádné výsledky pro report.")
+        return
+
+    for pop in sorted({r["pop"] for r in rows}):
+        _plot(rows, "dim", "pop", pop, "evals_per_sec", "evals/s",
+              f"{OUT_DIR}/throughput_vs_dim_N{pop}.png")
+        _plot(rows, "dim", "pop", pop, "peak_mem_mb", "peak memory [MB]",
+              f"{OUT_DIR}/memory_vs_dim_N{pop}.png")
+    for dim in sorted({r["dim"] for r in rows}):
+        _plot(rows, "pop", "dim", dim, "evals_per_sec", "evals/s",
+              f"{OUT_DIR}/throughput_vs_pop_D{dim}.png")
+
+    md_path = f"{OUT_DIR}/scaling_summary.md"
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write(f"# Škálování – {objective}, {evals} evaluací na buňku\n\n")
+        f.write("| Algorithm | D | N | evals/s | µs/gen | Peak mem [MB] | Final best |\n")
+        f.write("|-----------|---|---|---------|--------|---------------|------------|\n")
+        for r in sorted(rows, key=lambda r: (r["algorithm"], r["dim"], r["pop"])):
+            us_gen = 1e6 * r["seconds"] / max(1, r["evals"] // r["pop"])
+            f.write(f"| {r['algorithm']} | {r['dim']} | {r['pop']} | {r['evals_per_sec']:.0f} | "
+                    f"{us_gen:.1f} | {r['peak_mem_mb']:.2f} | {r['final_best']:.3e} |\n")
+
+    print(f"  → Report hotov: {md_path}")
+
+
+# ---------------------------------------------------------
+# MAIN ENTRY
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Studie škálování podle D a velikosti populace.")
+    parser.add_argument("--dims", type=int, nargs="+", default=DIMS)
+    parser.add_argument("--pops", type=int, nargs="+", default=POP_SIZES)
+    parser.add_argument("--algos", nargs="+", default=list(continuous_optimizers()),
+                        choices=list(continuous_optimizers()))
+    parser.add_argument("--objective", default="sphere", choices=list(OBJECTIVES))
+    parser.add_argument("--evals", type=int, default=EVALS)
+    args = parser.parse_args()
+
+    run_study(args.dims, args.pops, args.algos, args.objective, args.evals)
+    generate_report(args.objective, args.evals)
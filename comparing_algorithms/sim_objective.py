@@ -0,0 +1,158 @@
+import sys
+import json
+import asyncio
+import itertools
+
+import numpy as np
+
+# Objective served by an external simulator process over a socket or a pipe.
+# Protocol: one JSON object per line in both directions,
+#   request  {"id": 7, "x": [0.1, ...]}
+#   response {"id": 7, "f": 1.23}   or   {"id": 7, "error": "message"}
+# Responses may come in any order; they are matched to requests by id.
+
+
+class EvaluationError(RuntimeError):
+    """An evaluation failed (error response or timeout) on every attempt."""
+
+
+class SimulatorObjective:
+    """Async objective `await obj(x)` multiplexed over one connection to a simulator.
+
+    Args:
+        reader, writer: asyncio streams of the connection (see `connect` / `spawn`).
+        max_in_flight: At most this many requests wait for a response at once (K).
+        timeout: Seconds to wait for one response.
+        retries: Extra attempts after a failed or timed-out request.
+        fail_value: Value returned when every attempt failed; None raises EvaluationError.
+            A lost connection (ConnectionError) is always raised: every further
+            evaluation would fail too.
+        process: Simulator subprocess owned by this objective (terminated on close).
+    """
+
+    def __init__(self, reader, writer, max_in_flight=8, timeout=10.0, retries=2,
+                 fail_value=np.inf, process=None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.retries = retries
+        self.fail_value = fail_value
+        self.process = process
+
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._ids = itertools.count()
+        self._waiting = {}
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_responses())
+        self.stats = {"requests": 0, "retries": 0, "timeouts": 0, "errors": 0, "failed": 0,
+                      "bad_lines": 0}
+
+    @classmethod
+    async def connect(cls, host, port, **kwargs):
+        """Objective served by a simulator listening on a TCP socket."""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, **kwargs)
+
+    @classmethod
+    async def spawn(cls, *cmd, **kwargs):
+        """Start the simulator command and talk to it over its stdin/stdout."""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+        return cls(proc.stdout, proc.stdin, process=proc, **kwargs)
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    fut = self._waiting.pop(msg.get("id"), None)
+                    if fut is None or fut.done():
+                        continue  # answer to a request that already timed out
+                    if "error" in msg:
+                        fut.set_exception(EvaluationError(msg["error"]))
+                    else:
+                        fut.set_result(float(msg["f"]))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # the request of a broken line times out and is retried
+                    self.stats["bad_lines"] += 1
+                    print(f"sim_objective: nečitelná odpověď {line[:200]!r} ({e!r})", file=sys.stderr)
+        finally:
+            for fut in self._waiting.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("simulátor ukončil spojení"))
+            self._waiting.clear()
+
+    async def _request(self, x):
+        req_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting[req_id] = fut
+        try:
+            self.writer.write(json.dumps({"id": req_id, "x": np.asarray(x, dtype=float).tolist()}).encode() + b"\n")
+            await self.writer.drain()
+            return await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self._waiting.pop(req_id, None)
+
+    async def __call__(self, x):
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            async with self._slots:
+                self.stats["requests"] += 1
+                try:
+                    return await self._request(x)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    last_error = EvaluationError(f"timeout {self.timeout} s")
+                except EvaluationError as e:
+                    self.stats["errors"] += 1
+                    last_error = e
+
+        self.stats["failed"] += 1
+        if self.fail_value is None:
+            raise last_error
+        return self.fail_value
+
+    async def evaluate_many(self, X):
+        """Values of all rows of X in order; up to `max_in_flight` are evaluated concurrently."""
+        return np.array(await asyncio.gather(*(self(x) for x in X)), dtype=float)
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass  # the simulator already closed its end
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        if self.process is not None:
+            if self.process.returncode is None:
+                self.process.terminate()
+            await self.process.wait()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+
+def run_on_simulator(optimizer, cmd, **kwargs):
+    """Run `optimizer.arun` on a simulator started from `cmd` (argv list) and stop it afterwards.
+
+    `kwargs` go to `SimulatorObjective` (max_in_flight, timeout, retries, fail_value).
+    Returns (result of `arun`, request statistics).
+    """
+    async def _run():
+        async with await SimulatorObjective.spawn(*cmd, **kwargs) as objective:
+            result = await optimizer.arun(objective)
+            return result, dict(objective.stats)
+
+    return asyncio.run(_run())
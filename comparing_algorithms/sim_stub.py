@@ -0,0 +1,81 @@
+"""Stub simulator speaking the `sim_objective` line protocol, for trying the async
+adapter without the real simulator.
+
+    python sim_stub.py --function rastrigin --delay 0.01 0.05          # stdin/stdout
+    python sim_stub.py --port 5555 --fail 0.05 --drop 0.01             # TCP
+
+Every request is answered after a random delay (requests overlap, answers come
+out of order); with probability --fail it gets an error response and with
+probability --drop no response at all (the client times out).
+"""
+import sys
+import json
+import random
+import asyncio
+import argparse
+
+import numpy as np
+
+from main import PROBLEMS
+
+
+async def serve(reader, writer, args, rnd):
+    func = PROBLEMS[args.function]["fn"]
+
+    async def answer(msg):
+        await asyncio.sleep(rnd.uniform(*args.delay))
+        u = rnd.random()
+        if u < args.drop:
+            return
+        if u < args.drop + args.fail:
+            reply = {"id": msg["id"], "error": "simulace selhala"}
+        else:
+            reply = {"id": msg["id"], "f": float(func(np.asarray(msg["x"], dtype=float)))}
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+
+    tasks = set()
+    while line := await reader.readline():
+        task = asyncio.create_task(answer(json.loads(line)))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    writer.close()
+
+
+async def serve_stdio(args, rnd):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    await serve(reader, writer, args, rnd)
+
+
+async def serve_tcp(args, rnd):
+    server = await asyncio.start_server(lambda r, w: serve(r, w, args, rnd), args.host, args.port)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Testovací simulátor pro sim_objective.")
+    p.add_argument("--function", default="sphere", choices=sorted(PROBLEMS))
+    p.add_argument("--delay", nargs=2, type=float, default=(0.0, 0.0), metavar=("MIN", "MAX"),
+                   help="náhodné zpoždění odpovědi v sekundách")
+    p.add_argument("--fail", type=float, default=0.0, help="pravděpodobnost chybové odpovědi")
+    p.add_argument("--drop", type=float, default=0.0, help="pravděpodobnost, že odpověď nepřijde")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=None, help="naslouchat na TCP portu místo stdin/stdout")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rnd = random.Random(args.seed)
+    asyncio.run(serve_tcp(args, rnd) if args.port is not None else serve_stdio(args, rnd))
+
+
+if __name__ == "__main__":
+    main()
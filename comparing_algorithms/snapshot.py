@@ -0,0 +1,83 @@
+import os
+import json
+import uuid
+import pickle
+import hashlib
+
+import numpy as np
+
+
+def save_snapshot(path, state):
+    """Atomically write an optimizer state: a crash leaves either the old or the new file.
+
+    The temporary file is unique per call, so two workers holding the same cell
+    (one of them with an expired lease) never write into each other's file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def config_key(config):
+    """Stable hash of a run configuration (JSON-like; numpy values allowed)."""
+    text = json.dumps(config, sort_keys=True, default=lambda o: np.asarray(o).tolist())
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def load_snapshot(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+class Snapshotter:
+    """Periodic snapshots of one optimizer run.
+
+    Args:
+        path: Snapshot file or None to disable snapshots.
+        every: Write a snapshot each time another `every` evaluations were spent.
+        config: Configuration of the run (seed, parameters, budget, ...). Its hash is
+            stored with every snapshot; a snapshot written under another
+            configuration is discarded instead of resumed.
+    """
+
+    def __init__(self, path=None, every=None, config=None):
+        self.path = path
+        self.every = every
+        self.key = None if config is None else config_key(config)
+        self._next = None
+
+    @property
+    def enabled(self):
+        return self.path is not None and bool(self.every)
+
+    def restore(self):
+        """Saved state or None when there is nothing (valid) to resume from."""
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        saved = load_snapshot(self.path)
+        if not isinstance(saved, dict) or saved.get("config") != self.key or "state" not in saved:
+            print(f"Snapshot {self.path} patří k jiné konfiguraci běhu, zahazuji ho.")
+            self.remove()
+            return None
+        return saved["state"]
+
+    def start(self, eval_count):
+        """Start counting from `eval_count` (0 for a fresh run, more after a restore)."""
+        if self.enabled:
+            self._next = (eval_count // self.every + 1) * self.every
+
+    def maybe_save(self, eval_count, get_state):
+        """Save `get_state()` when `eval_count` passed the next multiple of `every`."""
+        if not self.enabled:
+            return
+        if eval_count >= self._next:
+            save_snapshot(self.path, {"config": self.key, "state": get_state()})
+            self._next = (eval_count // self.every + 1) * self.every
+
+    def remove(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
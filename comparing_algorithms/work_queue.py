@@ -0,0 +1,241 @@
+import os
+import time
+import pickle
+import socket
+import sqlite3
+import threading
+import uuid
+
+from results_db import Transaction
+
+QUEUE_PATH = "results/queue.db"
+
+# A claimed cell belongs to its worker until lease_until. The worker extends the
+# lease every HEARTBEAT_SEC from a background thread; when it dies the lease runs
+# out and any other worker may claim the cell again. A cell is claimed at most
+# MAX_ATTEMPTS times: one whose lease ran out after the last attempt (the worker
+# was killed, e.g. out of memory) is marked failed instead of handed out again.
+# Leases use wall-clock time, so the clocks of the nodes must be synchronized.
+LEASE_SEC = 300.0
+HEARTBEAT_SEC = 60.0
+POLL_SEC = 10.0
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cells (
+    id          INTEGER PRIMARY KEY,
+    dim         INTEGER NOT NULL,
+    fname       TEXT    NOT NULL,
+    algo        TEXT    NOT NULL,
+    run_id      INTEGER NOT NULL,
+    status      TEXT    NOT NULL DEFAULT 'pending',  -- pending | claimed | done | collected | failed
+    worker      TEXT,
+    token       TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    result      BLOB,
+    UNIQUE (dim, fname, algo, run_id)
+);
+CREATE INDEX IF NOT EXISTS cells_status ON cells (status, lease_until);
+"""
+
+
+class WorkQueue:
+    """Queue of experiment cells (dim, fname, algo, run_id) in one SQLite file.
+
+    Several processes, also on different nodes sharing the filesystem, claim cells
+    atomically (BEGIN IMMEDIATE), keep them alive with heartbeats and store the
+    pickled result of a finished cell. One collector moves the results into the
+    results database. The rollback journal is used instead of WAL, because WAL
+    needs shared memory and therefore does not work over a network filesystem.
+    """
+
+    def __init__(self, path=QUEUE_PATH, lease=LEASE_SEC, timeout=120.0):
+        self.path = path
+        self.lease = lease
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # -----------------------------------------------------
+    # Setup
+    # -----------------------------------------------------
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def enqueue(self, cells):
+        """Add cells (dim, fname, algo, run_id); cells already in the queue are ignored."""
+        with Transaction(self.conn):
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO cells (dim, fname, algo, run_id) VALUES (?, ?, ?, ?)",
+                list(cells))
+            return self.conn.total_changes - before
+
+    # -----------------------------------------------------
+    # Worker side
+    # -----------------------------------------------------
+
+    def claim(self, worker, max_attempts=MAX_ATTEMPTS):
+        """Claim one pending cell or one whose lease ran out.
+
+        Returns (cell_id, token, (dim, fname, algo, run_id)) or None. The token
+        identifies this claim: a worker that lost its lease can no longer
+        heartbeat or complete the cell. Cells whose lease ran out after
+        `max_attempts` claims are marked failed here.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with Transaction(self.conn):
+            self.conn.execute(
+                "UPDATE cells SET status = 'failed', lease_until = NULL,"
+                " error = 'lease expired after ' || attempts || ' attempts'"
+                " WHERE status = 'claimed' AND lease_until < ? AND attempts >= ?",
+                (now, max_attempts))
+            row = self.conn.execute(
+                "SELECT id, dim, fname, algo, run_id FROM cells"
+                " WHERE status = 'pending'"
+                " OR (status = 'claimed' AND lease_until < ? AND attempts < ?)"
+                " ORDER BY id LIMIT 1", (now, max_attempts)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE cells SET status = 'claimed', worker = ?, token = ?, lease_until = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (worker, token, now + self.lease, row[0]))
+        return row[0], token, tuple(row[1:])
+
+    def heartbeat(self, cell_id, token):
+        """Extend the lease; False when the claim was lost (lease expired and re-claimed)."""
+        cur = self.conn.execute(
+            "UPDATE cells SET lease_until = ? WHERE id = ? AND token = ? AND status = 'claimed'",
+            (time.time() + self.lease, cell_id, token))
+        return cur.rowcount == 1
+
+    def complete(self, cell_id, token, result):
+        """Store the result of a claimed cell; False (result dropped) if the claim was lost."""
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        cur = self.conn.execute(
+            "UPDATE cells SET status = 'done', result = ?, lease_until = NULL"
+            " WHERE id = ? AND token = ? AND status = 'claimed'",
+            (payload, cell_id, token))
+        return cur.rowcount == 1
+
+    def fail(self, cell_id, token, error, max_attempts=MAX_ATTEMPTS):
+        """Give the cell back to the queue, or mark it failed after `max_attempts` claims."""
+        self.conn.execute(
+            "UPDATE cells SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+            " error = ?, lease_until = NULL WHERE id = ? AND token = ? AND status = 'claimed'",
+            (max_attempts, error, cell_id, token))
+
+    def in_flight(self):
+        """Number of cells claimed under a valid lease."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM cells WHERE status = 'claimed' AND lease_until >= ?",
+            (time.time(),)).fetchone()[0]
+
+    # -----------------------------------------------------
+    # Collector side
+    # -----------------------------------------------------
+
+    def take_done(self, limit=100):
+        """Up to `limit` finished, not yet collected results as [(cell_id, result), ...]."""
+        rows = self.conn.execute(
+            "SELECT id, result FROM cells WHERE status = 'done' ORDER BY id LIMIT ?", (limit,))
+        return [(cell_id, pickle.loads(payload)) for cell_id, payload in rows]
+
+    def mark_collected(self, cell_ids):
+        with Transaction(self.conn):
+            self.conn.executemany("UPDATE cells SET status = 'collected', result = NULL WHERE id = ?",
+                                  [(i,) for i in cell_ids])
+
+    def unfinished_groups(self):
+        """(dim, fname) groups that still have cells not collected (failed cells do not count)."""
+        rows = self.conn.execute(
+            "SELECT DISTINCT dim, fname FROM cells WHERE status IN ('pending', 'claimed', 'done')")
+        return {tuple(r) for r in rows}
+
+    def counts(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM cells GROUP BY status").fetchall())
+
+
+class _Heartbeat(threading.Thread):
+    """Extends the lease of one claimed cell from a separate connection until stopped."""
+
+    def __init__(self, path, lease, cell_id, token, every=HEARTBEAT_SEC):
+        super().__init__(daemon=True)
+        self.path, self.lease = path, lease
+        self.cell_id, self.token = cell_id, token
+        self.every = every
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        with WorkQueue(self.path, self.lease) as queue:
+            while not self._stop_event.wait(self.every):
+                if not queue.heartbeat(self.cell_id, self.token):
+                    self.lost = True
+                    return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def work(path, run_fn, worker=None, lease=LEASE_SEC, heartbeat=HEARTBEAT_SEC,
+         poll=POLL_SEC, max_attempts=MAX_ATTEMPTS):
+    """Worker loop: claim a cell, run `run_fn(cell)`, store its result, repeat.
+
+    Returns the number of completed cells once nothing is left to claim and no
+    other worker holds a live lease (a lease that runs out is re-claimed here).
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    completed = 0
+
+    with WorkQueue(path, lease) as queue:
+        while True:
+            claimed = queue.claim(worker, max_attempts)
+            if claimed is None:
+                if queue.in_flight() == 0:
+                    return completed
+                time.sleep(poll)
+                continue
+
+            cell_id, token, cell = claimed
+            beat = _Heartbeat(path, lease, cell_id, token, heartbeat)
+            beat.start()
+            try:
+                result = run_fn(cell)
+            except Exception as e:
+                beat.stop()
+                queue.fail(cell_id, token, repr(e), max_attempts)
+                print(f"[{worker}] {cell} selhal: {e!r}")
+                continue
+            beat.stop()
+
+            if queue.complete(cell_id, token, result):
+                completed += 1
+            else:
+                print(f"[{worker}] {cell}: lease vypršel, výsledek zahozen")
@@ -0,0 +1,57 @@
+# Kanonický soubor: geneticky_algoritmus-bin_problem/fitness_cache.py. Shodná kopie
+# je v geneticky_algoritmus-real_problem/, aby každá složka běžela samostatně;
+# upravujte kanonický soubor a kopii pak přepište.
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def genotype_key(x):
+    """Klíč bitového genotypu: bity sbalené po osmi do bajtů (0/1 pole libovolného tvaru)."""
+    return np.packbits(x, axis=None).tobytes()
+
+
+class FitnessCache:
+    """
+    Omezená LRU cache fitness podle genotypu.
+
+    Elity a potomci, které křížení a mutace nechaly stejné jako rodiče, se tak
+    nevyhodnocují znovu. Fitness musí být deterministická a cache patří jednomu
+    běhu (jedné fitness funkci). Počítadla `hits` / `misses` se nenulují mezi voláními.
+    """
+
+    def __init__(self, maxsize=10_000):
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def evaluate(self, fitness_fn, x):
+        """Vrátí (fitness, hit); při missu zavolá `fitness_fn(x)` a výsledek uloží."""
+        key = genotype_key(x)
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value, True
+
+        self.misses += 1
+        value = fitness_fn(x)
+        if self.maxsize > 0:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value, False
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
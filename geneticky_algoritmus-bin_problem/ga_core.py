@@ -1,7 +1,15 @@
 import os
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+from fitness_cache import FitnessCache
+from selection import select
+from packed import PACKED_FITNESS, random_population, crossover_packed, mutate_packed
+
 RNG_SEED = 40
 RUNS = 10
 DIM_LIST = [10, 30, 100]
@@ -12,7 +20,13 @@ ELITE_FRAC = 0.10
 P_CROSS = 1.0
 P_MUT = 0.01
 
-_rng = np.random.RandomState(RNG_SEED)
+# Cache fitness podle genotypu (0 = vypnuto). S CACHE_HITS_COST = True stojí hit
+# jednu evaluaci rozpočtu jako dřív (výsledky beze změny, jen rychleji), s False
+# se počítají jen skutečná vyhodnocení.
+CACHE_SIZE = 10_000
+CACHE_HITS_COST = True
+
+_rng = np.random.default_rng(RNG_SEED)   # jen pro ga_run / ga_run_packed
 
 def set_hyperparams(pop_factor=None, elite_frac=None, p_crossover=None, p_mut=None):
     global POP_FACTOR, ELITE_FRAC, P_CROSS, P_MUT
@@ -26,6 +40,14 @@ def set_hyperparams(pop_factor=None, elite_frac=None, p_crossover=None, p_mut=No
     if p_mut is not None:
         P_MUT = float(p_mut)
 
+def set_cache(size=None, hits_cost=None):
+    global CACHE_SIZE, CACHE_HITS_COST
+
+    if size is not None:
+        CACHE_SIZE = int(size)
+    if hits_cost is not None:
+        CACHE_HITS_COST = bool(hits_cost)
+
 def fit_onemax(x):
     return int(np.sum(x))
 
@@ -37,122 +59,319 @@ def fit_leading_ones(x):
     else:
         return int(x.size)
 
-def _select_roulette(fits, rng):
-    total = np.sum(fits)
-
-    if total <= 0:
-        return rng.randint(len(fits))
-
-    pick = rng.rand() * total
-    current = 0.0
-
-    for i, f in enumerate(fits):
-        current += f
-        if current >= pick:
-            return i
-
-    return len(fits) - 1
-
-def _select_rank(fits, rng):
-    order = np.argsort(fits)
-    ranks = np.empty_like(order)
-    ranks[order] = np.arange(1, len(fits) + 1)
-
-    total = np.sum(ranks)
-    pick = rng.randint(1, total + 1)
-    current = 0
-
-    for i, weight in enumerate(ranks):
-        current += int(weight)
-        if current >= pick:
-            return i
-
-    return len(fits) - 1
-
-def _one_point_crossover(p1, p2, rng):
-    length = p1.size
-
-    if length < 2:
-        return p1.copy(), p2.copy()
-
-    if rng.rand() >= P_CROSS:
-        return p1.copy(), p2.copy()
-
-    cut = rng.randint(1, length)
-    child1 = np.concatenate([p1[:cut], p2[cut:]])
-    child2 = np.concatenate([p2[:cut], p1[cut:]])
-
-    return child1, child2
-
-def _mutate_bits(x, rng):
-    if P_MUT > 0:
-        mask = rng.rand(x.size) < P_MUT
-        x[mask] = 1 - x[mask]
-
-def ga_run(D, fitness_fn, selection):
-    budget = 100 * D
-    pop_size = max(2, int(POP_FACTOR * D))
-    elite_n = max(0, min(pop_size, int(round(ELITE_FRAC * pop_size))))
-
-    pop = _rng.randint(0, 2, size=(pop_size, D), dtype=np.int8)
-    fits = np.zeros(pop_size, dtype=np.int32)
-    best_hist = np.zeros(budget, dtype=np.int32)
-    evals = 0
-
-    if selection == "roulette":
-        sel_fun = _select_roulette
+FITNESS = {"onemax": fit_onemax, "leading_ones": fit_leading_ones}
+
+# Přírůstkové vyhodnocení: potomek nese původ (rodiče, jejich fitness, řez křížení
+# a překlopené pozice) a delta funkce z něj dopočítá fitness bez průchodu přes
+# všech D genů. Potomek je p1[:cut] + p2[cut:] (cut = None -> kopie p1) a pak
+# jsou překlopeny bity na (různých) pozicích `flips`. Problém se přihlásí
+# delta funkcí delta(child, lineage) -> fitness v DELTA_FITNESS.
+Lineage = namedtuple("Lineage", "p1 p2 fit1 fit2 cut flips")
+
+def _first_zero(x, start):
+    """První nula v x od pozice start (nebo x.size); čte jen úsek, který opravdu projde."""
+    step = 64
+    while start < x.size:
+        zeros = np.flatnonzero(x[start:start + step] == 0)
+        if zeros.size:
+            return start + int(zeros[0])
+        start += step
+        step *= 2
+    return int(x.size)
+
+def delta_onemax(child, lin):
+    # křížení: vyměněný úsek se dopočítá z kratší strany řezu, mutace ±1 za bit
+    if lin.cut is None:
+        f = lin.fit1
+    elif lin.cut <= child.size - lin.cut:
+        f = lin.fit2 - int(lin.p2[:lin.cut].sum()) + int(lin.p1[:lin.cut].sum())
     else:
-        sel_fun = _select_rank
-
-    for i in range(pop_size):
-        if evals >= budget:
-            break
-        fits[i] = fitness_fn(pop[i])
-        evals += 1
-
-    best_so_far = int(np.max(fits))
-    best_hist[:evals] = best_so_far
-
-    while evals < budget:
-        if elite_n > 0:
-            elites = pop[np.argsort(-fits)[:elite_n]].copy()
-            new_pop = [elites]
-        else:
-            new_pop = []
-
-        while sum(p.shape[0] for p in new_pop) < pop_size:
-            parent1 = pop[sel_fun(fits, _rng)]
-            parent2 = pop[sel_fun(fits, _rng)]
-
-            child1, child2 = _one_point_crossover(parent1, parent2, _rng)
-            _mutate_bits(child1, _rng)
-            _mutate_bits(child2, _rng)
-
-            needed = pop_size - sum(p.shape[0] for p in new_pop)
-
-            if needed >= 2:
-                new_pop.append(np.stack([child1, child2], axis=0))
-            else:
-                new_pop.append(child1.reshape(1, -1))
-
-        pop = np.concatenate(new_pop, axis=0)
+        f = lin.fit1 - int(lin.p1[lin.cut:].sum()) + int(lin.p2[lin.cut:].sum())
+    if len(lin.flips):
+        f += 2 * int(child[lin.flips].sum()) - len(lin.flips)
+    return f
+
+def delta_leading_ones(child, lin):
+    # po křížení: první nula p1 před řezem zůstává, jinak rozhoduje p2 od řezu
+    if lin.cut is None or lin.fit1 < lin.cut:
+        lo = lin.fit1
+    elif lin.fit2 >= lin.cut:
+        lo = lin.fit2
+    else:
+        lo = _first_zero(lin.p2, lin.cut)
+    # mutace: jednička překlopená před `lo` je nová první nula, překlopená nula na `lo` posune hledání dál
+    if len(lin.flips):
+        before = lin.flips[lin.flips < lo]
+        if before.size:
+            lo = int(before.min())
+        elif np.any(lin.flips == lo):
+            lo = _first_zero(child, lo)
+    return lo
+
+DELTA_FITNESS = {"onemax": delta_onemax, "leading_ones": delta_leading_ones}
+
+
+class BinaryGA:
+    """
+    Jeden běh GA nad binárním řetězcem délky D.
+
+    Objekt drží vlastní konfiguraci i generátor (`np.random.Generator`) a nesahá
+    na globální stav modulu, takže nezávislé běhy mohou běžet souběžně ve vláknech
+    nebo procesech a každý je reprodukovatelný ze svého seedu (viz `run_seed`).
+
+    fitness: "onemax" / "leading_ones" nebo funkce jednoho 0/1 vektoru (jen bez `packed`).
+    packed: bitově sbalená populace (packed.py) pro D v řádu 1e5–1e6; bez fitness cache.
+    pop_size, budget: výchozí max(2, pop_factor * D) a 100 * D.
+    seed: int, SeedSequence nebo Generator (sdílený generátor = sdílený proud čísel).
+    cache_size, cache_hits_cost: None = aktuální CACHE_SIZE / CACHE_HITS_COST modulu
+        (čtou se při vytvoření objektu, takže platí i `set_cache`).
+    cache: vlastní FitnessCache (jinak se vytvoří podle `cache_size`).
+    delta: delta funkce pro fitness zadanou funkcí (u jmen se vezme z DELTA_FITNESS).
+    incremental: počítat fitness potomků přes delta funkci (výchozí vypnuto). Výsledek
+        je stejný jako při plném vyhodnocení (i rozpočet). Delta evaluace nahrazuje fitness
+        cache: s incremental=True se cache nevytváří a není-li delta funkce, je to chyba.
+    """
+
+    def __init__(self, D, fitness, selection="rank", pop_factor=POP_FACTOR, elite_frac=ELITE_FRAC,
+                 p_crossover=P_CROSS, p_mut=P_MUT, cache_size=None, cache_hits_cost=None,
+                 packed=False, pop_size=None, budget=None, seed=None, cache=None,
+                 delta=None, incremental=False):
+        self.D = int(D)
+        self.problem = fitness if isinstance(fitness, str) else None
+        self.fitness_fn = FITNESS[fitness] if isinstance(fitness, str) else fitness
+        if packed and self.problem is None:
+            raise ValueError("packed=True potřebuje fitness zadanou jménem ('onemax' / 'leading_ones')")
+
+        self.selection = selection
+        self.p_cross = float(p_crossover)
+        self.p_mut = float(p_mut)
+        self.packed = packed
+        self.budget = 100 * self.D if budget is None else int(budget)
+        self.pop_size = max(2, int(pop_factor * self.D)) if pop_size is None else int(pop_size)
+        self.elite_n = max(0, min(self.pop_size, int(round(elite_frac * self.pop_size))))
+        if incremental and (cache is not None or (cache_size or 0) > 0):
+            raise ValueError("fitness cache a incremental=True se vylučují, zvolte jedno")
+        cache_size = CACHE_SIZE if cache_size is None else int(cache_size)
+        self.cache_hits_cost = CACHE_HITS_COST if cache_hits_cost is None else bool(cache_hits_cost)
+        self.delta_fn = delta if delta is not None else DELTA_FITNESS.get(self.problem)
+        if incremental and (self.delta_fn is None or packed):
+            raise ValueError("incremental=True potřebuje delta funkci (nebo fitness 'onemax' / "
+                             "'leading_ones') a nesbalenou populaci")
+        self.incremental = bool(incremental)
+        self.cache = (cache if cache is not None or packed or cache_size <= 0 or self.incremental
+                      else FitnessCache(cache_size))
+        self.rng = np.random.default_rng(seed)
+
+    def _crossover(self, p1, p2):
+        """Vrací (child1, child2, cut); cut = None, když ke křížení nedošlo."""
+        length = p1.size
+
+        if length < 2:
+            return p1.copy(), p2.copy(), None
+
+        if self.rng.random() >= self.p_cross:
+            return p1.copy(), p2.copy(), None
+
+        cut = int(self.rng.integers(1, length))
+        child1 = np.concatenate([p1[:cut], p2[cut:]])
+        child2 = np.concatenate([p2[:cut], p1[cut:]])
+
+        return child1, child2, cut
+
+    def _mutate(self, x):
+        """Překlopí každý bit s pravděpodobností p_mut a vrátí překlopené pozice.
+
+        Pozice se losují geometrickými mezerami (Bernoulliho proces), takže cena
+        je úměrná počtu překlopení, ne D.
+        """
+        if self.p_mut <= 0:
+            return np.empty(0, dtype=np.int64)
+        n = x.size
+        parts, last = [], -1
+        while last < n:
+            steps = last + np.cumsum(self.rng.geometric(min(self.p_mut, 1.0), size=int(n * self.p_mut) + 4))
+            parts.append(steps[steps < n])
+            last = int(steps[-1])
+        flips = np.concatenate(parts)
+        x[flips] = 1 - x[flips]
+        return flips
+
+    def run(self):
+        """Vrací (best_hist, final): best-so-far po každé evaluaci a nejlepší fitness poslední populace."""
+        if self.packed:
+            return self._run_packed()
+
+        D, budget, pop_size, elite_n = self.D, self.budget, self.pop_size, self.elite_n
+        cache, fitness_fn = self.cache, self.fitness_fn
+
+        pop = self.rng.integers(0, 2, size=(pop_size, D), dtype=np.int8)
+        fits = np.zeros(pop_size, dtype=np.int32)
+        best_hist = np.zeros(budget, dtype=np.int32)
+        evals = 0
+        free_hits = 0   # hity za sebou bez nového genotypu (jen když hity nestojí rozpočet)
+
+        def evaluate(x):
+            nonlocal evals, free_hits
+            if cache is None:
+                evals += 1
+                return fitness_fn(x), True
+            value, hit = cache.evaluate(fitness_fn, x)
+            if hit and not self.cache_hits_cost:
+                free_hits += 1
+                return value, False
+            evals += 1
+            free_hits = 0
+            return value, True
 
         for i in range(pop_size):
             if evals >= budget:
                 break
+            fits[i], _ = evaluate(pop[i])
+
+        best_so_far = int(np.max(fits))
+        best_hist[:evals] = best_so_far
+
+        while evals < budget:
+            elite_idx = np.argsort(-fits)[:elite_n]
+            new_pop = [pop[elite_idx].copy()] if elite_n > 0 else []
+            no_flips = np.empty(0, dtype=np.int64)
+            lineage = [Lineage(pop[i], pop[i], int(fits[i]), int(fits[i]), None, no_flips) for i in elite_idx]
+
+            # všichni rodiče generace najednou (váhy / pořadí jen jednou za generaci)
+            n_children = pop_size - elite_n
+            parents = select(self.selection, fits, 2 * ((n_children + 1) // 2), self.rng)
+
+            for k in range(0, n_children, 2):
+                i, j = parents[k], parents[k + 1]
+                child1, child2, cut = self._crossover(pop[i], pop[j])
+                flips1 = self._mutate(child1)
+                flips2 = self._mutate(child2)
+                fi, fj = int(fits[i]), int(fits[j])
+                lineage.append(Lineage(pop[i], pop[j], fi, fj, cut, flips1))
+                lineage.append(Lineage(pop[j], pop[i], fj, fi, cut, flips2))
+
+                if n_children - k >= 2:
+                    new_pop.append(np.stack([child1, child2], axis=0))
+                else:
+                    new_pop.append(child1.reshape(1, -1))
+
+            pop = np.concatenate(new_pop, axis=0)
+
+            for i in range(pop_size):
+                if evals >= budget:
+                    break
+
+                if self.incremental:
+                    fits[i] = self.delta_fn(pop[i], lineage[i])
+                    evals += 1
+                else:
+                    fits[i], counted = evaluate(pop[i])
+                    if not counted:
+                        continue
+
+                if fits[i] > best_so_far:
+                    best_so_far = int(fits[i])
+
+                best_hist[evals - 1] = best_so_far
+
+            # populace se točí jen na známých genotypech -> nový už nevznikne
+            if free_hits >= budget:
+                best_hist[evals:] = best_so_far
+                break
 
-            fits[i] = fitness_fn(pop[i])
-            evals += 1
-
-            if fits[i] > best_so_far:
-                best_so_far = int(fits[i])
-
-            best_hist[evals - 1] = best_so_far
-
-        if evals < budget:
-            best_hist[evals:] = best_so_far
-
-    return best_hist, int(np.max(fits))
+            if evals < budget:
+                best_hist[evals:] = best_so_far
+
+        return best_hist, int(np.max(fits))
+
+    def _run_packed(self):
+        """`run` nad bitově sbalenou populací: stejný rozpočet (evaluace stojí i elity),
+        stejný počet elit a stejná návratová hodnota, jen operace po 64 bitech."""
+        D, budget, pop_size, elite_n = self.D, self.budget, self.pop_size, self.elite_n
+        fitness_fn = PACKED_FITNESS[self.problem]
+
+        best_hist = np.zeros(budget, dtype=np.int32)
+        evals = 0
+        best_so_far = -1
+
+        def evaluate(pop, fits):
+            """Vyhodnotí řádky v pořadí, dokud zbývá rozpočet; ostatní si nechají `fits`."""
+            nonlocal evals, best_so_far
+            n = min(len(pop), budget - evals)
+            fits = fits.copy()
+            fits[:n] = fitness_fn(pop[:n], D)
+            running = np.maximum.accumulate(np.maximum(fits[:n], best_so_far))
+            best_hist[evals:evals + n] = running
+            if n:
+                best_so_far = int(running[-1])
+            evals += n
+            return fits
+
+        pop = random_population(pop_size, D, self.rng)
+        fits = evaluate(pop, np.zeros(pop_size, dtype=np.int64))
+
+        while evals < budget:
+            elite = np.argsort(-fits)[:elite_n]
+            n_children = pop_size - elite_n
+            pairs = (n_children + 1) // 2
+            parents = select(self.selection, fits, 2 * pairs, self.rng)
+
+            child1, child2 = crossover_packed(pop[parents[0::2]], pop[parents[1::2]], D, self.p_cross, self.rng)
+            children = np.empty((2 * pairs, pop.shape[1]), dtype=np.uint64)
+            children[0::2], children[1::2] = child1, child2
+            children = mutate_packed(children[:n_children], D, self.p_mut, self.rng)
+
+            # elity se vyhodnocují znovu jako v `run` (stojí rozpočet)
+            pop = np.concatenate([pop[elite], children])
+            fits = evaluate(pop, fits)
+
+        return best_hist, int(np.max(fits))
+
+
+def _current_config():
+    return dict(pop_factor=POP_FACTOR, elite_frac=ELITE_FRAC, p_crossover=P_CROSS, p_mut=P_MUT,
+                cache_size=CACHE_SIZE, cache_hits_cost=CACHE_HITS_COST)
+
+def ga_run(D, fitness_fn, selection, cache=None):
+    """Jeden běh s globálním nastavením modulu a sdíleným `_rng` (výsledek závisí na pořadí volání)."""
+    return BinaryGA(D, fitness_fn, selection, seed=_rng, cache=cache, **_current_config()).run()
+
+def ga_run_packed(D, problem, selection, pop_size=None, budget=None):
+    """`ga_run` nad bitově sbalenou populací (viz BinaryGA, packed=True)."""
+    return BinaryGA(D, problem, selection, packed=True, pop_size=pop_size, budget=budget,
+                    seed=_rng, **_current_config()).run()
+
+
+# ---------------------------------------------------------
+# Nezávislé běhy paralelně
+# ---------------------------------------------------------
+
+def _name_key(name):
+    return zlib.crc32(str(name).encode("utf-8"))
+
+def run_seed(problem, D, setting, run_id):
+    """Seed jednoho běhu odvozený z jeho identity (ne z pořadí spuštění)."""
+    return np.random.SeedSequence(entropy=RNG_SEED,
+                                  spawn_key=(_name_key(problem), int(D), _name_key(setting), int(run_id)))
+
+def _run_job(kwargs):
+    return BinaryGA(**kwargs).run()
+
+def _with_module_cache(job):
+    """Doplní nastavení cache modulu (set_cache) do jobu; proces pracovníka ho nemusí znát."""
+    job = dict(job)
+    job.setdefault("cache_hits_cost", CACHE_HITS_COST)
+    if not job.get("incremental"):
+        job.setdefault("cache_size", CACHE_SIZE)
+    return job
+
+def run_parallel(jobs, workers=None):
+    """Spustí běhy `BinaryGA(**job)` v procesech; výsledky (best_hist, final) ve stejném pořadí jako `jobs`."""
+    jobs = [_with_module_cache(job) for job in jobs]
+    if workers == 1 or len(jobs) <= 1:
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_job, jobs, chunksize=max(1, len(jobs) // (8 * (workers or os.cpu_count() or 1)))))
 
 def save_plot(mean_curve, std_curve, title, problem, D, selection):
     path = f"charts/{problem}/{D}"
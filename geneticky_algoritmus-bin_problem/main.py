@@ -1,25 +1,29 @@
 import numpy as np
 from ga_core import (
-    ga_run, fit_onemax, fit_leading_ones, save_plot, compute_stats, write_stats_md,
-    PROBLEMS, DIM_LIST, RUNS, POP_FACTOR, ELITE_FRAC, P_MUT
+    run_parallel, run_seed, save_plot, compute_stats, write_stats_md,
+    PROBLEMS, DIM_LIST, RUNS, POP_FACTOR, ELITE_FRAC, P_CROSS, P_MUT
 )
 
 from readme_generator import create_readme
 
 SELECTIONS = ["roulette", "rank"]
 
-def run_all():
+def run_all(workers=None):
+    # všechny běhy (problém × D × selekce × běh) najednou paralelně, každý s vlastním seedem
+    cells = [(problem, D, selection, run)
+             for problem in PROBLEMS for D in DIM_LIST for selection in SELECTIONS for run in range(RUNS)]
+    jobs = [dict(D=D, fitness=problem, selection=selection, pop_factor=POP_FACTOR, elite_frac=ELITE_FRAC,
+                 p_crossover=P_CROSS, p_mut=P_MUT, seed=run_seed(problem, D, selection, run))
+            for problem, D, selection, run in cells]
+    results = dict(zip(cells, run_parallel(jobs, workers)))
+
     for problem in PROBLEMS:
-        fitness = fit_onemax if problem == "onemax" else fit_leading_ones
         name = "OneMax" if problem == "onemax" else "LeadingOnes"
         for D in DIM_LIST:
             rows_for_md = []
             for selection in SELECTIONS:
-                runs_hist, finals = [], []
-                for _ in range(RUNS):
-                    hist, fin = ga_run(D, fitness, selection)
-                    runs_hist.append(hist); finals.append(fin)
-                runs_hist = np.stack(runs_hist, 0); finals = np.array(finals)
+                runs = [results[(problem, D, selection, run)] for run in range(RUNS)]
+                runs_hist = np.stack([hist for hist, _ in runs], 0); finals = np.array([fin for _, fin in runs])
                 mean_curve, std_curve = runs_hist.mean(0), runs_hist.std(0)
                 title = f"{name} – D={D} – sel={selection}, pop≈{int(POP_FACTOR*D)}, elite={ELITE_FRAC}, pmut={P_MUT}"
                 save_plot(mean_curve, std_curve, title, problem, D, selection)
@@ -0,0 +1,139 @@
+import numpy as np
+
+# Bitově sbalená populace: jedinec je řádek uint64 slov, bit j genomu je bit
+# (j % 64) slova j // 64 (od nejnižšího bitu). Bity za D v posledním slově jsou
+# vždy 0 (fitness s tím počítají). Oproti int8 na bit je to 8× méně paměti a
+# operace běží po 64 bitech najednou. `rng` je np.random.Generator.
+
+WORD_BITS = 64
+ALL_ONES = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words):
+        return np.bitwise_count(words)
+else:  # numpy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        words = np.ascontiguousarray(words, dtype="<u8")
+        return _POP8[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
+def n_words(D):
+    return (D + WORD_BITS - 1) // WORD_BITS
+
+
+def tail_mask(D):
+    """Maska platných bitů posledního slova."""
+    r = D % WORD_BITS
+    return ALL_ONES if r == 0 else np.uint64((1 << r) - 1)
+
+
+def low_bits(b):
+    """Slova s nastavenými bity 0..b-1 (b = 0..63) pro pole b."""
+    b = np.asarray(b, dtype=np.uint64)
+    return (np.uint64(1) << b) - np.uint64(1)
+
+
+def pack(bits):
+    """(N, D) pole 0/1 -> (N, W) uint64."""
+    bits = np.atleast_2d(np.asarray(bits, dtype=np.uint8))
+    N, D = bits.shape
+    padded = np.zeros((N, n_words(D) * WORD_BITS), dtype=np.uint8)
+    padded[:, :D] = bits
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def unpack(words, D):
+    """(N, W) uint64 -> (N, D) int8 pole 0/1."""
+    words = np.ascontiguousarray(np.atleast_2d(words), dtype="<u8")
+    bits = np.unpackbits(words.view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :D].astype(np.int8)
+
+
+def random_population(N, D, rng):
+    pop = rng.integers(0, 2 ** 64, size=(N, n_words(D)), dtype=np.uint64)
+    pop[:, -1] &= tail_mask(D)
+    return pop
+
+
+# ---------------------------------------------------------
+# Fitness celé populace
+# ---------------------------------------------------------
+
+def onemax_packed(pop):
+    return popcount(pop).sum(axis=1, dtype=np.int64)
+
+
+def leading_ones_packed(pop, D):
+    """Počet jedniček na začátku genomu: první slovo, které není samé jedničky,
+    a v něm počet jedniček od nejnižšího bitu (= trailing zeros negace)."""
+    N, W = pop.shape
+    not_full = pop != ALL_ONES
+    has = not_full.any(axis=1)
+    k = np.where(has, np.argmax(not_full, axis=1), W - 1)
+    inv = ~pop[np.arange(N), k]
+    lowest = inv & (~inv + np.uint64(1))     # nejnižší nastavený bit negace
+    tz = popcount(lowest - np.uint64(1)).astype(np.int64)
+    return np.where(has, np.minimum(k * WORD_BITS + tz, D), D)
+
+
+PACKED_FITNESS = {
+    "onemax": lambda pop, D: onemax_packed(pop),
+    "leading_ones": leading_ones_packed,
+}
+
+
+# ---------------------------------------------------------
+# Variace
+# ---------------------------------------------------------
+
+def crossover_packed(p1, p2, D, p_cross, rng):
+    """Jednobodové křížení párů (p1[i], p2[i]) slovními maskami.
+
+    Bity před řezem jdou z prvního rodiče: slova před slovem řezu celá, slovo
+    řezu přes masku nižších bitů, zbytek z druhého rodiče. Páry bez křížení
+    (pravděpodobnost 1 - p_cross) dostanou masku samých jedniček = kopie.
+    """
+    pairs, W = p1.shape
+    if D < 2:
+        return p1.copy(), p2.copy()
+
+    cut = rng.integers(1, D, size=pairs)
+    word, bit = cut // WORD_BITS, cut % WORD_BITS
+    cols = np.arange(W)
+    mask = np.where(cols < word[:, None], ALL_ONES, np.uint64(0))
+    mask[cols == word[:, None]] = low_bits(bit)
+    mask[rng.random(pairs) >= p_cross] = ALL_ONES
+
+    child1 = (p1 & mask) | (p2 & ~mask)
+    child2 = (p2 & mask) | (p1 & ~mask)
+    return child1, child2
+
+
+def mutate_packed(pop, D, p_mut, rng):
+    """Nezávislé překlopení každého bitu s pravděpodobností p_mut (XOR, na místě).
+
+    Pozice překlopení se generují geometrickými mezerami Bernoulliho procesu,
+    takže cena je úměrná počtu překlopení, ne N * D.
+    """
+    if p_mut <= 0:
+        return pop
+    N, W = pop.shape
+    total = N * D
+    positions = []
+    last = -1
+    while True:
+        chunk = max(16, int(1.2 * (total - last) * p_mut))
+        steps = last + np.cumsum(rng.geometric(p_mut, size=chunk))
+        positions.append(steps[steps < total])
+        if steps[-1] >= total:
+            break
+        last = int(steps[-1])
+    positions = np.concatenate(positions)
+
+    row, bit = positions // D, positions % D
+    flat = pop.reshape(-1)
+    np.bitwise_xor.at(flat, row * W + bit // WORD_BITS,
+                      np.uint64(1) << (bit % WORD_BITS).astype(np.uint64))
+    return pop
@@ -1,9 +1,9 @@
 # param_eval.py
 import os
+import math
+import itertools
 import numpy as np
-from ga_core import (
-    ga_run, fit_onemax, fit_leading_ones, set_hyperparams, compute_stats
-)
+from ga_core import run_parallel, run_seed, compute_stats, POP_FACTOR, ELITE_FRAC, P_CROSS, P_MUT
 
 def _score(stats, success_rate, med_evals):
     # menší je lepší (lexikograficky)
@@ -15,14 +15,20 @@ def _score(stats, success_rate, med_evals):
         (med_evals if med_evals is not None else 1e12),
     )
 
-def _eval_one(problem, D, selection, pop_factor, elite_frac, p_crossover, p_mut, runs):
-    fitness = fit_onemax if problem == "onemax" else fit_leading_ones
+def _p_mut(value, D):
+    return (1.0 / D) if (isinstance(value, str) and value.lower() == "1/d") else float(value)
+
+def _jobs(problem, D, s, first, last):
+    """Běhy first..last-1 nastavení `s`; seed běhu závisí jen na (problem, D, name, run)."""
+    return [dict(D=D, fitness=problem, selection=s["selection"], pop_factor=s["pop_factor"],
+                 elite_frac=s["elite_frac"], p_crossover=s["p_crossover"], p_mut=_p_mut(s["p_mut"], D),
+                 seed=run_seed(problem, D, s["name"], run))
+            for run in range(first, last)]
+
+def _summarize(results, D):
     target = D
-    # dočasně nastav GA hyperparametry
-    set_hyperparams(pop_factor, elite_frac, p_crossover, p_mut)
     finals, hit = [], []
-    for _ in range(runs):
-        hist, fin = ga_run(D, fitness, selection)
+    for hist, fin in results:
         finals.append(fin)
         if fin >= target and np.any(hist >= target):
             hit.append(int(np.argmax(hist >= target)) + 1)
@@ -32,7 +38,36 @@ def _eval_one(problem, D, selection, pop_factor, elite_frac, p_crossover, p_mut,
     med = float(np.median(hit)) if hit else None
     return stats, sr, med
 
-def evaluate_param_settings_benchmark(problem, D, settings, runs, out_path="eval_stats.md"):
+def _row(s, results, D):
+    stats, sr, med = _summarize(results, D)
+    return {
+        **s, "p_mut": (s["p_mut"] if isinstance(s["p_mut"], str) else float(s["p_mut"])),
+        "stats": stats, "sr": sr, "med_evals": med, "score": _score(stats, sr, med), "runs": len(results)
+    }
+
+def _write_table(f, rows, extra=()):
+    """Markdown tabulka nastavení; `extra` = [(nadpis, funkce řádku), ...] se přidá na konec."""
+    f.write("| name | selection | pop_factor | elite_frac | p_crossover | p_mut | best | worst | mean | median | std | success_rate | median_evals_to_opt |"
+            + "".join(f" {title} |" for title, _ in extra) + "\n")
+    f.write("|------|-----------|------------|------------|-------------|------|------|-------|------|--------|-----|--------------|---------------------|"
+            + "".join("-" * (len(title) + 2) + "|" for title, _ in extra) + "\n")
+    for r in rows:
+        st = r["stats"]
+        f.write(
+            f"| {r['name']} | {r['selection']} | {r['pop_factor']} | {r['elite_frac']} | {r['p_crossover']} | {r['p_mut']} | "
+            f"{st['best']:.2f} | {st['worst']:.2f} | {st['mean']:.2f} | {st['median']:.2f} | {st['std']:.2f} | "
+            f"{r['sr']:.2f} | {'' if r['med_evals'] is None else int(r['med_evals'])} |"
+            + "".join(f" {fn(r)} |" for _, fn in extra) + "\n"
+        )
+    f.write("\n")
+
+def _write_recommendation(f, best):
+    f.write(f"**Doporučeno:** `{best['name']}` "
+            f"(selection={best['selection']}, pop_factor={best['pop_factor']}, "
+            f"elite_frac={best['elite_frac']}, p_crossover={best['p_crossover']}, "
+            f"p_mut={best['p_mut']}).\n")
+
+def evaluate_param_settings_benchmark(problem, D, settings, runs, out_path="eval_stats.md", workers=None):
     """
     Otestuje zadaná nastavení jen pro konkrétní problem ('onemax' nebo 'leading_ones') a D (např. 50).
     Uloží Markdown tabulku s porovnáním do souboru `out_path` (výchozí: eval_stats.md).
@@ -41,41 +76,139 @@ def evaluate_param_settings_benchmark(problem, D, settings, runs, out_path="eval
         name, selection, pop_factor, elite_frac, p_crossover, p_mut
     ))
     - p_mut může být číslo nebo řetězec '1/D'
+    workers: počet procesů (None = počet jader, 1 = sériově)
     """
-    rows = []
+    # nastavení × běhy paralelně
+    jobs = []
     for s in settings:
-        pmut = (1.0 / D) if (isinstance(s["p_mut"], str) and s["p_mut"].lower() == "1/d") else float(s["p_mut"])
-        stats, sr, med = _eval_one(
-            problem, D,
-            s["selection"], s["pop_factor"], s["elite_frac"], s["p_crossover"], pmut,
-            runs
-        )
-        rows.append({
-            **s, "p_mut": (s["p_mut"] if isinstance(s["p_mut"], str) else float(s["p_mut"])),
-            "stats": stats, "sr": sr, "med_evals": med, "score": _score(stats, sr, med)
-        })
+        jobs += _jobs(problem, D, s, 0, runs)
+    results = run_parallel(jobs, workers)
 
+    rows = [_row(s, results[k * runs:(k + 1) * runs], D) for k, s in enumerate(settings)]
     rows.sort(key=lambda r: r["score"])   # nejlepší první
-    best = rows[0]
 
     # Markdown tabulka + doporučení
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(f"## Benchmark parametrů – {problem} – D={D}\n\n")
         f.write("Řazeno dle: success rate, mean, median, std, medián evaluací do optima.\n\n")
-        f.write("| name | selection | pop_factor | elite_frac | p_crossover | p_mut | best | worst | mean | median | std | success_rate | median_evals_to_opt |\n")
-        f.write("|------|-----------|------------|------------|-------------|------|------|-------|------|--------|-----|--------------|---------------------|\n")
-        for r in rows:
-            st = r["stats"]
-            f.write(
-                f"| {r['name']} | {r['selection']} | {r['pop_factor']} | {r['elite_frac']} | {r['p_crossover']} | {r['p_mut']} | "
-                f"{st['best']:.2f} | {st['worst']:.2f} | {st['mean']:.2f} | {st['median']:.2f} | {st['std']:.2f} | "
-                f"{r['sr']:.2f} | {'' if r['med_evals'] is None else int(r['med_evals'])} |\n"
-            )
-        f.write("\n")
-        f.write(f"**Doporučeno:** `{best['name']}` "
-                f"(selection={best['selection']}, pop_factor={best['pop_factor']}, "
-                f"elite_frac={best['elite_frac']}, p_crossover={best['p_crossover']}, "
-                f"p_mut={best['p_mut']}).\n")
+        _write_table(f, rows)
+        _write_recommendation(f, rows[0])
 
     print(f"Benchmark uložen do: {out_path}")
     return out_path
+
+
+# ---------------------------------------------------------
+# Generování kandidátů
+# ---------------------------------------------------------
+
+PARAM_KEYS = ("selection", "pop_factor", "elite_frac", "p_crossover", "p_mut")
+
+def _setting_name(s):
+    return f"{s['selection']}-pf{s['pop_factor']}-el{s['elite_frac']}-pc{s['p_crossover']}-pm{s['p_mut']}"
+
+def grid_settings(space):
+    """
+    Všechny kombinace hodnot z `space` = {klíč z PARAM_KEYS: [hodnoty]}.
+    Chybějící klíče dostanou výchozí hodnotu z ga_core.
+    """
+    space = {**_default_space(), **space}
+    settings = [dict(zip(PARAM_KEYS, values)) for values in itertools.product(*(space[k] for k in PARAM_KEYS))]
+    return [{"name": _setting_name(s), **s} for s in settings]
+
+def random_settings(space, n, seed=0):
+    """
+    `n` náhodných nastavení: u seznamu se hodnota vybere rovnoměrně z jeho prvků,
+    u dvojice (low, high) rovnoměrně z intervalu (zaokrouhleno na 4 platné číslice).
+    """
+    space = {**_default_space(), **space}
+    rng = np.random.default_rng(seed)
+    settings = []
+    for _ in range(n):
+        s = {}
+        for k in PARAM_KEYS:
+            v = space[k]
+            if isinstance(v, tuple):
+                s[k] = float(f"{rng.uniform(v[0], v[1]):.4g}")
+            else:
+                s[k] = v[rng.integers(len(v))]
+        settings.append({"name": _setting_name(s), **s})
+    # stejné kombinace by závodily samy se sebou (i se stejnými seedy)
+    return list({s["name"]: s for s in settings}.values())
+
+def _default_space():
+    return {"selection": ["rank"], "pop_factor": [POP_FACTOR], "elite_frac": [ELITE_FRAC],
+            "p_crossover": [P_CROSS], "p_mut": [P_MUT]}
+
+
+# ---------------------------------------------------------
+# Racing (successive halving)
+# ---------------------------------------------------------
+
+def race_param_settings(problem, D, settings, runs, eta=2, first_runs=None,
+                        out_path="race_stats.md", workers=None):
+    """
+    Successive halving nad nastaveními: v každém kole dostanou živá nastavení
+    další běhy (celkem first_runs, first_runs*eta, ... až `runs`), seřadí se podle
+    `_score` ze všech dosavadních běhů a dál postoupí jen lepší 1/eta. Kdo zbude
+    jako poslední (nebo dojde do `runs` běhů), je vyhodnocen plným počtem běhů.
+    Běhy s týmž indexem mají stejné seedy jako v `evaluate_param_settings_benchmark`.
+
+    first_runs: počet běhů v 1. kole (None = tak, aby v posledním kole vyšlo `runs`).
+    Uloží Markdown tabulku do `out_path` včetně počtu ušetřených běhů a vrátí seřazené řádky.
+    """
+    names = [s["name"] for s in settings]
+    if len(set(names)) != len(names):
+        raise ValueError("Jména nastavení musí být unikátní (určují seedy běhů)")
+
+    if first_runs is None:
+        rounds = max(1, math.ceil(math.log(max(2, len(settings)), eta)))
+        first_runs = max(2, runs // eta ** (rounds - 1))
+    results = {s["name"]: [] for s in settings}
+    eliminated = {}   # jméno -> kolo vyřazení
+    alive = list(settings)
+    target, rnd = min(first_runs, runs), 1
+
+    while True:
+        if len(alive) == 1:
+            target = runs
+        jobs, owners = [], []
+        for s in alive:
+            new = _jobs(problem, D, s, len(results[s["name"]]), target)
+            jobs += new
+            owners += [s["name"]] * len(new)
+        for name, res in zip(owners, run_parallel(jobs, workers)):
+            results[name].append(res)
+        print(f"Kolo {rnd}: {len(alive)} nastavení × {target} běhů")
+
+        if target >= runs:
+            break
+
+        ranked = sorted(alive, key=lambda s: _row(s, results[s["name"]], D)["score"])
+        keep = max(1, math.ceil(len(alive) / eta))
+        for s in ranked[keep:]:
+            eliminated[s["name"]] = rnd
+        alive = ranked[:keep]
+        target, rnd = min(runs, target * eta), rnd + 1
+
+    rows = [_row(s, results[s["name"]], D) for s in settings]
+    for r in rows:
+        r["round"] = eliminated.get(r["name"])
+    # finalisté (podle skóre), pak vyřazení od nejpozdějšího kola
+    rows.sort(key=lambda r: (r["round"] is not None, -(r["round"] or 0), r["score"]))
+
+    spent = sum(r["runs"] for r in rows)
+    full = len(settings) * runs
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(f"## Racing parametrů – {problem} – D={D}\n\n")
+        f.write(f"Successive halving (eta={eta}, 1. kolo {min(first_runs, runs)} běhů, nejvýše {runs} běhů). "
+                "Finalisté jsou řazeni dle success rate, mean, median, std a mediánu evaluací do optima, "
+                "vyřazení podle kola vyřazení.\n\n")
+        _write_table(f, rows, extra=[("runs", lambda r: r["runs"]),
+                                     ("vyřazen v kole", lambda r: "" if r["round"] is None else r["round"])])
+        f.write(f"Spotřebováno {spent} běhů z {full} při plném vyhodnocení všech nastavení "
+                f"(ušetřeno {full - spent}, tj. {(full - spent) / full:.0%}).\n\n")
+        _write_recommendation(f, rows[0])
+
+    print(f"Racing uložen do: {out_path} (ušetřeno {full - spent} z {full} běhů)")
+    return rows
@@ -2,6 +2,9 @@ import os
 import numpy as np
 import matplotlib.pyplot as plt
 
+from fitness_cache import FitnessCache
+from selection import select
+
 # Nastavení
 RNG_SEED = 42
 np.random.seed(RNG_SEED)
@@ -15,6 +18,10 @@ P_MUT_BIT = 1 / 32
 P_MUT_REAL = 0.1
 GAUSS_SIGMA_FRAC = 0.05
 WORD = 32
+# Cache fitness bitových variant podle genotypu (0 = vypnuto); s CACHE_HITS_COST = False
+# hity nestojí evaluaci rozpočtu
+CACHE_SIZE = 50_000
+CACHE_HITS_COST = True
 
 
 # Testovací funkce
@@ -73,13 +80,6 @@ def save_stats_md(problem, results, path):
 
 
 # GA operátory
-def rank_selection(fitness):
-    ranks = np.argsort(fitness)
-    probs = np.linspace(1, len(fitness), len(fitness))
-    probs = probs / np.sum(probs)
-    return np.random.choice(ranks, p=probs[::-1])
-
-
 def crossover(p1, p2):
     point = np.random.randint(1, len(p1))
     return np.concatenate([p1[:point], p2[point:]]), np.concatenate([p2[:point], p1[point:]])
@@ -149,7 +149,7 @@ def mutate_random(x, bounds):
 
 
 # Hlavní smyčka GA
-def run_ga(problem, decode_fn=None, real_mut=None, mode="bit"):
+def run_ga(problem, decode_fn=None, real_mut=None, mode="bit", cache=None):
     fn = PROBLEMS[problem]["fn"]
     bounds = PROBLEMS[problem]["bounds"]
 
@@ -158,12 +158,26 @@ def run_ga(problem, decode_fn=None, real_mut=None, mode="bit"):
     best_history = np.zeros(EVAL_BUDGET, dtype=float)
     best_so_far = np.inf
 
+    if mode != "bit":
+        cache = None
+    elif cache is None and CACHE_SIZE > 0:
+        cache = FitnessCache(CACHE_SIZE)
+    decoded_fn = lambda bits: fn(bit_to_real(bits, bounds, decode_fn))
+    free_hits = 0
+
     while evals < EVAL_BUDGET:
         fitness = np.zeros(len(pop), dtype=float)
         for i, ind in enumerate(pop):
-            x = bit_to_real(ind, bounds, decode_fn) if mode == "bit" else ind
-            val = fn(x)
-            fitness[i] = val
+            if cache is not None:
+                val, hit = cache.evaluate(decoded_fn, ind)
+                fitness[i] = val
+                if hit and not CACHE_HITS_COST:
+                    free_hits += 1
+                    continue
+                free_hits = 0
+            else:
+                val = decoded_fn(ind) if mode == "bit" else fn(ind)
+                fitness[i] = val
 
             if val < best_so_far:
                 best_so_far = val
@@ -175,14 +189,21 @@ def run_ga(problem, decode_fn=None, real_mut=None, mode="bit"):
 
         if evals >= EVAL_BUDGET:
             break
+        if free_hits >= EVAL_BUDGET:
+            best_history[evals:] = best_so_far
+            break
 
         elite_count = int(ELITE_FRAC * POP_SIZE)
         elite_idx = np.argsort(fitness)[:elite_count]
         new_pop = [pop[i].copy() for i in elite_idx]
 
-        while len(new_pop) < POP_SIZE:
-            p1 = pop[rank_selection(fitness)]
-            p2 = pop[rank_selection(fitness)]
+        # pořadová selekce všech rodičů generace najednou
+        n_pairs = (POP_SIZE - len(new_pop) + 1) // 2
+        parents = select("rank", fitness, 2 * n_pairs, np.random, minimize=True)
+
+        for k in range(n_pairs):
+            p1 = pop[parents[2 * k]]
+            p2 = pop[parents[2 * k + 1]]
             c1, c2 = crossover(p1, p2)
             if mode == "bit":
                 bit_mutate(c1);
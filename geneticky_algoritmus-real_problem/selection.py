@@ -0,0 +1,71 @@
+# Canonical file: comparing_algorithms/selection.py. Byte-identical copies live in
+# geneticky_algoritmus-bin_problem/ and geneticky_algoritmus-real_problem/ so that
+# every folder runs on its own; edit the canonical file and copy it over the others.
+
+import numpy as np
+
+# Parent selection for a whole generation in one call. Weights (or ranks) are
+# computed once per generation, all parents are then drawn by binary search in
+# the cumulative weights: O(n log n) per generation instead of a linear scan
+# (and for rank selection a full sort) per parent.
+#
+# `rng` only needs `rng.random(size)`, so numpy Generator, RandomState and the
+# np.random module all work. `minimize` says whether lower fitness is better.
+
+SELECTIONS = ("roulette", "rank", "tournament")
+
+
+def roulette_weights(fits, minimize=False):
+    """Fitness-proportional weights.
+
+    Maximization uses the fitness itself (it must be non-negative), minimization
+    the distance to the worst finite value; infinite fitness gets weight 0.
+    """
+    fits = np.asarray(fits, dtype=float)
+    if not minimize:
+        return fits
+    finite = np.isfinite(fits)
+    if not finite.any():
+        return np.zeros(len(fits))
+    return np.where(finite, fits[finite].max() - fits, 0.0)
+
+
+def rank_weights(fits, minimize=False):
+    """Linear rank weights: the worst individual gets 1, the best len(fits) (ties by argsort order)."""
+    fits = np.asarray(fits)
+    n = len(fits)
+    weights = np.empty(n, dtype=float)
+    order = np.argsort(fits)
+    weights[order] = np.arange(n, 0, -1) if minimize else np.arange(1, n + 1)
+    return weights
+
+
+def sample_weights(weights, n, rng):
+    """`n` indices drawn with probability proportional to `weights` (uniform if they sum to <= 0)."""
+    cdf = np.cumsum(weights, dtype=float)
+    m = len(cdf)
+    if m == 0 or cdf[-1] <= 0:
+        return np.minimum((rng.random(n) * m).astype(int), m - 1)
+    idx = np.searchsorted(cdf, rng.random(n) * cdf[-1], side="right")
+    return np.minimum(idx, m - 1)
+
+
+def tournament(fits, n, rng, size=2, minimize=False):
+    """Winners of `n` tournaments of `size` individuals drawn with replacement."""
+    fits = np.asarray(fits, dtype=float)
+    m = len(fits)
+    entrants = np.minimum((rng.random((n, size)) * m).astype(int), m - 1)
+    scores = fits[entrants]
+    best = np.argmin(scores, axis=1) if minimize else np.argmax(scores, axis=1)
+    return entrants[np.arange(n), best]
+
+
+def select(method, fits, n, rng, minimize=False, tournament_size=2):
+    """Indices of `n` parents chosen from `fits` by "roulette", "rank" or "tournament"."""
+    if method == "roulette":
+        return sample_weights(roulette_weights(fits, minimize), n, rng)
+    if method == "rank":
+        return sample_weights(rank_weights(fits, minimize), n, rng)
+    if method == "tournament":
+        return tournament(fits, n, rng, tournament_size, minimize)
+    raise ValueError(f"Neznámá selekce {method!r} (známé: {SELECTIONS})")
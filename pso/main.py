@@ -12,18 +12,18 @@ if __name__ == "__main__":
 
         print("Spouštím varianty PSO...")
         print("  Lineární w (0.8→0.3), global")
-        (fes1, mean1, std1), hist1 = run_multiple(lambda: variant_linear(func, bounds))
+        agg1, finals1 = run_multiple(lambda: variant_linear(func, bounds))
 
         print("  Konstantní w = 0.7, global")
-        (fes2, mean2, std2), hist2 = run_multiple(lambda: variant_const_global(func, bounds))
+        agg2, finals2 = run_multiple(lambda: variant_const_global(func, bounds))
 
         print("  Konstantní w = 0.6, ring")
-        (fes3, mean3, std3), hist3 = run_multiple(lambda: variant_const_ring(func, bounds))
+        agg3, finals3 = run_multiple(lambda: variant_const_ring(func, bounds))
 
         curves = [
-            (fes1, mean1, "lineární w (0.8→0.3), global"),
-            (fes2, mean2, "w = 0.7, global"),
-            (fes3, mean3, "w = 0.6, ring"),
+            (agg1, "lineární w (0.8→0.3), global"),
+            (agg2, "w = 0.7, global"),
+            (agg3, "w = 0.6, ring"),
         ]
 
         plot_convergence(
@@ -34,9 +34,9 @@ if __name__ == "__main__":
 
         # statistiky finálních hodnot
         stats = {
-            "lineární w (0.8→0.3) – global": compute_stats(hist1),
-            "w = 0.7 – global": compute_stats(hist2),
-            "w = 0.6 – ring": compute_stats(hist3),
+            "lineární w (0.8→0.3) – global": compute_stats(finals1),
+            "w = 0.7 – global": compute_stats(finals2),
+            "w = 0.6 – ring": compute_stats(finals3),
         }
 
         save_markdown(name, stats)
@@ -2,42 +2,42 @@ import numpy as np
 import matplotlib.pyplot as plt
 import os
 
+from curve_stats import CurveAggregator
+
 def ensure_dirs():
     os.makedirs("charts", exist_ok=True)
     os.makedirs("results", exist_ok=True)
 
-def run_multiple(factory, runs=10):
-    histories = []
-
-    for run_num in range(runs):
-        print(f"  Spouštím běh {run_num + 1}/{runs}...")
-        _, _, hist = factory().run()
-        histories.append(hist)
+def best_at(history, fes):
+    """Best-so-far value of a (fes, best) history at the given FES points."""
+    idx = np.searchsorted(history[:, 0], fes, side="right") - 1
+    return np.where(idx >= 0, history[np.maximum(idx, 0), 1], np.inf)
 
-    max_fes = max(h[-1][0] for h in histories)
 
-    padded = []
-    for h in histories:
-        fes_vals = [t[0] for t in h]
-        best_vals = [t[1] for t in h]
-
-        if fes_vals[-1] < max_fes:
-            fes_vals.append(max_fes)
-            best_vals.append(best_vals[-1])
+def run_multiple(factory, runs=10):
+    """Runs `factory()` `runs` times; each convergence curve is added to a streaming
+    aggregator right after its run, so no history is kept in memory.
 
-        padded.append((np.array(fes_vals), np.array(best_vals)))
+    Returns (CurveAggregator on the FES grid of the first run, final values).
+    """
+    agg = None
+    finals = []
 
-    all_fes = padded[0][0]
-    all_vals = np.vstack([p[1] for p in padded])
+    for run_num in range(runs):
+        print(f"  Spouštím běh {run_num + 1}/{runs}...")
+        _, best_val, hist = factory().run()
+        hist = np.asarray(hist, dtype=float)
 
-    mean_curve = np.mean(all_vals, axis=0)
-    std_curve = np.std(all_vals, axis=0)
+        if agg is None:
+            agg = CurveAggregator(hist[:, 0])
+        agg.add(best_at(hist, agg.xs))
+        finals.append(best_val)
 
-    return (all_fes, mean_curve, std_curve), histories
+    return agg, np.array(finals)
 
 
-def compute_stats(histories):
-    finals = np.array([h[-1][1] for h in histories])
+def compute_stats(finals):
+    finals = np.asarray(finals, dtype=float)
     return {
         "best": float(finals.min()),
         "worst": float(finals.max()),
@@ -48,10 +48,14 @@ def compute_stats(histories):
 
 
 def plot_convergence(curves, title, save_as):
+    """`curves`: list of (CurveAggregator, label); mean line, median dashed, IQR band."""
     plt.figure(figsize=(12, 6))
 
-    for fes, mean_curve, label in curves:
-        plt.plot(fes, mean_curve, linewidth=2, label=label)
+    for agg, label in curves:
+        line, = plt.plot(agg.xs, agg.mean, linewidth=2, label=label)
+        q25, q75 = agg.iqr_band()
+        plt.plot(agg.xs, agg.median, color=line.get_color(), linewidth=1, linestyle="--")
+        plt.fill_between(agg.xs, q25, q75, color=line.get_color(), alpha=0.15, linewidth=0)
 
     plt.yscale("log")
     plt.xlabel("FES (počet vyhodnocení)")